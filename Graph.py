@@ -1,3 +1,5 @@
+from bisect import insort
+
 class Graph:
     def __init__(self, size: int) -> None:
         """
@@ -20,6 +22,27 @@ class Graph:
             for v2 in self.vertices[v1]:
                 c.addEdge(v1, v2)
         return c
+
+    @classmethod
+    def cycle(cls, size: int, shift: int = 1):
+        """
+        Joins every vertex to the one shift places after it, which for
+        the default shift is the cycle on size vertices.
+        """
+        g = cls(size)
+        for vertex in range(size):
+            g.addEdge(vertex, (vertex + shift) % size)
+        return g
+
+    @classmethod
+    def fromEdges(cls, size: int, edges: list[tuple[int, int]]):
+        """
+        The graph on size vertices with the given edges.
+        """
+        g = cls(size)
+        for v1, v2 in edges:
+            g.addEdge(v1, v2)
+        return g
     
     def card(self, delete: int):
         """
@@ -49,10 +72,178 @@ class Graph:
             print(str(vertex))
         print()
 
+class BitGraph:
+    def __init__(self, size: int) -> None:
+        """
+        Graphs are stored as one integer per vertex, where bit j of
+        rows[i] is set when vertices i and j are adjacent
+        """
+        self.size = size
+        self.rows = [0 for _ in range(size)]
+        self.adjLists = None
+
+    @classmethod
+    def fromRows(cls, rows: list[int]):
+        """
+        Creates a BitGraph directly from a list of adjacency rows.
+        """
+        g = cls(len(rows))
+        g.rows = list(rows)
+        return g
+
+    @classmethod
+    def fromGraph(cls, g: Graph):
+        """
+        Converts an adjacency list Graph into a BitGraph.
+        """
+        rows = [0 for _ in range(len(g.vertices))]
+        for v1 in range(len(g.vertices)):
+            for v2 in g.vertices[v1]:
+                rows[v1] |= 1 << v2
+        return cls.fromRows(rows)
+
+    def toGraph(self) -> Graph:
+        """
+        Converts the BitGraph back into an adjacency list Graph.
+        """
+        g = Graph(self.size)
+        g.vertices = [list(neighbors) for neighbors in self.vertices]
+        return g
+
+    @property
+    def vertices(self) -> list[list[int]]:
+        """
+        Read-only adjacency lists in ascending order, built on demand so
+        that code written against Graph keeps working.
+        """
+        if self.adjLists is None:
+            self.adjLists = []
+            for row in self.rows:
+                neighbors = []
+                while row:
+                    low = row & -row
+                    neighbors.append(low.bit_length() - 1)
+                    row ^= low
+                self.adjLists.append(neighbors)
+        return self.adjLists
+
+    def addEdge(self, vertex1: int, vertex2: int) -> None:
+        self.rows[vertex1] |= 1 << vertex2
+        self.rows[vertex2] |= 1 << vertex1
+        self.adjLists = None
+
+    def toggleEdge(self, vertex1: int, vertex2: int) -> None:
+        """
+        Removes the edge if present and adds it otherwise, in place.
+        Cached adjacency lists are patched instead of rebuilt, so an
+        edge card can be looked at by toggling an edge, working on the
+        graph and toggling it back.
+        """
+        self.rows[vertex1] ^= 1 << vertex2
+        self.rows[vertex2] ^= 1 << vertex1
+        if self.adjLists is not None:
+            for vertex, other in ((vertex1, vertex2), (vertex2, vertex1)):
+                if (self.rows[vertex] >> other) & 1:
+                    insort(self.adjLists[vertex], other)
+                else:
+                    self.adjLists[vertex].remove(other)
+
+    def edges(self) -> list[tuple[int, int]]:
+        """
+        The edges as (vertex1, vertex2) pairs with vertex1 < vertex2, in
+        ascending order.
+        """
+        return [(v1, v2) for v1 in range(self.size) for v2 in self.vertices[v1] if v1 < v2]
+
+    def hasEdge(self, vertex1: int, vertex2: int) -> bool:
+        return (self.rows[vertex1] >> vertex2) & 1 == 1
+
+    def degree(self, vertex: int) -> int:
+        return bin(self.rows[vertex]).count("1")
+
+    def copy(self):
+        """
+        Creates a BitGraph object that's a copy of the original.
+        """
+        return BitGraph.fromRows(self.rows)
+
+    def card(self, delete: int):
+        """
+        Performs a vertex deletion by dropping the row of the deleted
+        vertex and slicing its bit out of every other row.
+        """
+        low = (1 << delete) - 1
+        rows = [(row & low) | ((row >> 1) & ~low) for row in self.rows]
+        del rows[delete]
+        return BitGraph.fromRows(rows)
+
+    def deck(self) -> list:
+        """
+        Returns the list of cards formed by vertex deletions on the graph.
+        """
+        return [self.card(vertex) for vertex in range(self.size)]
+
+    def edgeCard(self, vertex1: int, vertex2: int):
+        """
+        Returns a copy of the graph with the edge removed.
+        """
+        rows = list(self.rows)
+        rows[vertex1] &= ~(1 << vertex2)
+        rows[vertex2] &= ~(1 << vertex1)
+        return BitGraph.fromRows(rows)
+
+    def edgeDeck(self) -> list:
+        """
+        Returns the list of cards formed by edge deletions on the graph.
+        """
+        return [self.edgeCard(v1, v2) for v1, v2 in self.edges()]
+
+    def print(self) -> None:
+        for vertex in self.vertices:
+            print(str(vertex))
+        print()
+
 class Digraph(Graph):
     def addEdge(self, vertex1: int, vertex2: int) -> None:
         self.vertices[vertex1].append(vertex2)
 
 class WeightedDigraph(Graph):
     def addEdge(self, vertex1: int, vertex2: int, weight: int) -> None:
-        self.vertices[vertex1].append((vertex2, weight))
\ No newline at end of file
+        self.vertices[vertex1].append((vertex2, weight))
+
+#Unit tests
+#a 4-cycle with the chord (1, 3)
+DIAMOND = [(0, 1), (0, 3), (1, 2), (2, 3), (1, 3)]
+
+def test_cycle():
+    assert Graph.cycle(4).vertices == [[1, 3], [0, 2], [1, 3], [2, 0]]
+    assert Graph.fromEdges(4, DIAMOND).vertices == [[1, 3], [0, 2, 3], [1, 3], [0, 2, 1]]
+    assert BitGraph.fromGraph(Graph.cycle(6, 2)).rows == BitGraph.fromGraph(Graph.cycle(6, 4)).rows
+
+def test_BitGraph():
+    g = Graph.fromEdges(4, DIAMOND)
+    b = BitGraph.fromGraph(g)
+    assert b.rows == [0b1010, 0b1101, 0b1010, 0b0111]
+    assert b.hasEdge(1, 3) and not b.hasEdge(0, 2)
+    assert [b.degree(v) for v in range(4)] == [2, 3, 2, 3]
+    assert b.toGraph().vertices == [sorted(v) for v in g.vertices]
+
+def test_BitGraphCard():
+    g = Graph.fromEdges(4, DIAMOND)
+    b = BitGraph.fromGraph(g)
+    for vertex in range(4):
+        assert b.card(vertex).vertices == [sorted(v) for v in g.card(vertex).vertices]
+    assert len(b.deck()) == 4 and b.deck()[1].size == 3
+
+def test_BitGraphEdges():
+    g = Graph.fromEdges(4, DIAMOND)
+    b = BitGraph.fromGraph(g)
+    assert b.edges() == [(0, 1), (0, 3), (1, 2), (1, 3), (2, 3)]
+    b.toggleEdge(1, 3)
+    assert b.vertices == [[1, 3], [0, 2], [1, 3], [0, 2]] and not b.hasEdge(3, 1)
+    assert b.vertices == BitGraph.fromRows(b.rows).vertices
+    b.toggleEdge(3, 1)
+    assert b.vertices == [[1, 3], [0, 2, 3], [1, 3], [0, 1, 2]]
+    assert [card.rows for card in b.edgeDeck()] == [[0b1000, 0b1100, 0b1010, 0b0111], [0b0010, 0b1101, 0b1010, 0b0110],
+                                                    [0b1010, 0b1001, 0b1000, 0b0111], [0b1010, 0b0101, 0b1010, 0b0101],
+                                                    [0b1010, 0b1101, 0b0010, 0b0011]]
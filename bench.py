@@ -0,0 +1,178 @@
+import Graph, generator, isomorphisms, prog
+import argparse, io, json, os, platform, subprocess, sys, time
+from contextlib import redirect_stdout
+
+#Connected graphs, up to isomorphism, in the benchmark class of each n,
+#checked against the original pairwise search and brute force over all
+#edge sets
+UNIQUE = {6: 4, 7: 4, 8: 19}
+#The same counts for larger n, recorded from the canonical-form search
+#itself. They are regression snapshots, not correctness checks: they
+#catch changes in its output, not mistakes it has always made.
+SNAPSHOT = {9: 19, 10: 113, 11: 114, 12: 835}
+#Labeled graphs (all, connected) with the class's exact degree sequence,
+#checked against brute force over all edge sets
+LABELED = {6: (54, 54), 7: (810, 810), 8: (10095, 10080)}
+
+def benchDegrees(vertices: int) -> list[int]:
+    """
+    The fixed bidegreed class timed for each n: every vertex has degree
+    3 except one (n odd) or two (n even) of degree 2.
+    """
+    if vertices % 2:
+        return [3]*(vertices-1) + [2]
+    return [3]*(vertices-2) + [2, 2]
+
+def measure(func, repeat: int) -> float:
+    """
+    Best wall time of repeat calls, the usual way to keep noise out.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def quiet(func):
+    """
+    Runs func with the diagnostic prints of filt swallowed.
+    """
+    with redirect_stdout(io.StringIO()):
+        return func()
+
+def checkCounts(vertices: int, labeledMax: int) -> list[str]:
+    """
+    Checks that generation and deduplication still find exactly the
+    known graphs of the benchmark class, or as many as the snapshot
+    where none are known. Up to labeledMax vertices the plain search
+    has to agree with the symmetry-broken one. Returns the failures.
+    """
+    failures = []
+    degrees = benchDegrees(vertices)
+    possibilities = generator.genSpecs(vertices)
+    if vertices in LABELED and generator.countValid(vertices, degrees) != LABELED[vertices][0]:
+        failures.append(f"n={vertices}: counted {generator.countValid(vertices, degrees)} labeled graphs != {LABELED[vertices][0]}")
+    if vertices in LABELED and vertices <= labeledMax:
+        labeled = sum(1 for _ in generator.iterValid(vertices, degrees, possibilities))
+        connected = sum(1 for _ in generator.iterValid(vertices, degrees, possibilities, connected=True))
+        if (labeled, connected) != LABELED[vertices]:
+            failures.append(f"n={vertices}: labeled (all, connected) {(labeled, connected)} != {LABELED[vertices]}")
+    unique = quiet(lambda: prog.filt(generator.iterBiClass(vertices, degrees.count(3), 3, 2, possibilities, breakSymmetry=True, vectorized=False, connected=True), checked=True))
+    if vertices in UNIQUE and len(unique) != UNIQUE[vertices]:
+        failures.append(f"n={vertices}: {len(unique)} unique graphs != {UNIQUE[vertices]}")
+    if vertices in SNAPSHOT and len(unique) != SNAPSHOT[vertices]:
+        failures.append(f"n={vertices}: {len(unique)} unique graphs != snapshot {SNAPSHOT[vertices]}")
+    if vertices <= labeledMax:
+        plain = quiet(lambda: prog.filt(generator.iterBiClass(vertices, degrees.count(3), 3, 2, possibilities, breakSymmetry=False, vectorized=False, connected=True), checked=True))
+        if len(plain) != len(unique):
+            failures.append(f"n={vertices}: {len(plain)} unique graphs without symmetry breaking != {len(unique)} with it")
+    return failures
+
+def benchVertices(vertices: int, repeat: int, labeledMax: int) -> dict[str, float]:
+    """
+    Times the hot paths on the benchmark class of the given size.
+    Labeled generation is only timed up to labeledMax vertices, since
+    the labeled class grows roughly n! times faster than the unique one.
+    """
+    degrees = benchDegrees(vertices)
+    numDeg1 = degrees.count(3)
+    possibilities = generator.genSpecs(vertices)
+    unique = quiet(lambda: prog.filt(generator.iterBiClass(vertices, numDeg1, 3, 2, possibilities, breakSymmetry=True, vectorized=False, connected=True), checked=True))
+    results = {}
+    if vertices <= labeledMax:
+        results["genValid"] = measure(lambda: generator.genValid(vertices, degrees, possibilities), repeat)
+        results["genBiClass"] = measure(lambda: generator.genBiClass(vertices, numDeg1, 3, 2, possibilities), repeat)
+    results["genCanonical"] = measure(lambda: list(generator.iterCanonicalClass(vertices, degrees, connected=True)), repeat)
+    results["quotient"] = measure(lambda: [isomorphisms.quotient(g, isomorphisms.initPartition(g)) for g in unique], repeat)
+    results["terminal"] = measure(lambda: [isomorphisms.terminal(g, isomorphisms.quotient(g, isomorphisms.initPartition(g))) for g in unique], repeat)
+    results["representative"] = measure(lambda: [isomorphisms.representative(g) for g in unique], repeat)
+    results["certificate"] = measure(lambda: [isomorphisms.certificate(g) for g in unique], repeat)
+    results["card"] = measure(lambda: [g.card(v) for g in unique for v in range(vertices)], repeat)
+    results["deck"] = measure(lambda: [g.deck() for g in unique], repeat)
+    bits = [Graph.BitGraph.fromGraph(g) for g in unique]
+    results["bitCard"] = measure(lambda: [b.card(v) for b in bits for v in range(vertices)], repeat)
+    results["bitDeck"] = measure(lambda: [b.deck() for b in bits], repeat)
+    results["filt"] = measure(lambda: quiet(lambda: prog.filt(generator.iterBiClass(vertices, numDeg1, 3, 2, possibilities, breakSymmetry=True, vectorized=False, connected=True), checked=True)), repeat)
+    results["deckComp"] = measure(lambda: prog.deckComp(unique), repeat)
+    return results
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def loadHistory(path: str) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as history:
+        return [json.loads(line) for line in history if line.strip()]
+
+def regressions(results: dict[str, float], history: list[dict], window: int, threshold: float) -> list[str]:
+    """
+    Compares each timing with the best of the same case over the last
+    window recorded runs. Anything more than threshold times slower (and
+    at least a millisecond slower, to stay above timer noise) is flagged.
+    """
+    flagged = []
+    for case, seconds in results.items():
+        previous = [run["results"][case] for run in history if case in run["results"]][-window:]
+        if previous:
+            best = min(previous)
+            if seconds > best * threshold and seconds - best > 0.001:
+                flagged.append(f"{case}: {seconds:.4f}s vs best {best:.4f}s ({seconds/best:.2f}x)")
+    return flagged
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the generation, isomorphism and deck hot paths.")
+    parser.add_argument("-n", "--vertices", type=int, nargs="+", default=list(range(6, 13)),
+                        help="graph sizes to benchmark (known counts cover 6..8, snapshots 9..12)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--labeled-max", type=int, default=8,
+                        help="largest n for which full labeled generation is timed")
+    parser.add_argument("--history", default="bench_history.jsonl",
+                        help="JSON lines file the results are appended to and compared against")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=1.25)
+    parser.add_argument("--no-record", action="store_true", help="compare without appending to the history")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    failures = []
+    results = {}
+    for vertices in args.vertices:
+        failures += checkCounts(vertices, args.labeled_max)
+        for case, seconds in benchVertices(vertices, args.repeat, args.labeled_max).items():
+            results[f"{vertices}/{case}"] = seconds
+            print(f"n={vertices:<3} {case:<15} {seconds:.4f}s")
+
+    flagged = regressions(results, loadHistory(args.history), args.window, args.threshold)
+    for failure in failures:
+        print("COUNT MISMATCH " + failure)
+    for regression in flagged:
+        print("REGRESSION " + regression)
+    if not failures and not args.no_record:
+        with open(args.history, "a") as history:
+            history.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit(),
+                                      "python": platform.python_version(), "repeat": args.repeat,
+                                      "results": results}) + "\n")
+    if failures:
+        sys.exit(1)
+    if flagged and args.fail_on_regression:
+        sys.exit(2)
+
+#Unit tests
+def test_knownCounts():
+    for vertices in range(6, 10):
+        assert checkCounts(vertices, 8) == []
+
+def test_regressions():
+    history = [{"results": {"6/filt": 0.010}}, {"results": {"6/filt": 0.012}}]
+    assert regressions({"6/filt": 0.011}, history, 5, 1.25) == []
+    assert len(regressions({"6/filt": 0.020}, history, 5, 1.25)) == 1
+    assert regressions({"6/deck": 1.0}, history, 5, 1.25) == []
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import sqlite3, time
+from Graph import Graph
+import isomorphisms
+
+#bit-reversed bytes, for turning a row's bits above the diagonal
+#(lowest column first) into packRows' column order
+REVERSED = [int(format(byte, "08b")[::-1], 2) for byte in range(256)]
+
+def packRows(rows: list[int]) -> bytes:
+    """
+    Packs a graph given by its adjacency rows into bytes: the vertex
+    count followed by the upper triangle of its adjacency matrix read
+    row by row, which is the concatenation of the description ints
+    generator.individual decodes.
+    """
+    size = len(rows)
+    bits = 0
+    for i in range(size - 1):
+        width = size - i - 1
+        above = rows[i] >> (i + 1)
+        flipped = 0
+        done = 0
+        while done < width:
+            flipped = (flipped << 8) | REVERSED[above & 255]
+            above >>= 8
+            done += 8
+        bits = (bits << width) | (flipped >> (done - width))
+    return bytes([size]) + bits.to_bytes((size*(size-1)//2 + 7)//8, "big")
+
+def unpackRows(packed: bytes) -> tuple[int, ...]:
+    """
+    Inverse of packRows.
+    """
+    size = packed[0]
+    bits = int.from_bytes(packed[1:], "big")
+    rows = [0 for _ in range(size)]
+    shift = size*(size-1)//2
+    for i in range(size):
+        for j in range(i + 1, size):
+            shift -= 1
+            if (bits >> shift) & 1:
+                rows[i] |= 1 << j
+                rows[j] |= 1 << i
+    return tuple(rows)
+
+class CertificateCache:
+    def __init__(self, path: str, maxEntries: int = 10000000, flushSize: int = 50000) -> None:
+        """
+        Persistent map from a labeled graph (its packed upper triangle)
+        to its certificate, stored in sqlite so separate runs and worker
+        processes can share it. Entries written under a different
+        isomorphisms.CERTIFICATE_VERSION are dropped on open, and the
+        least recently used entries are evicted once the cache holds more
+        than maxEntries. Writes are batched until flush, or until
+        flushSize certificates are pending.
+        """
+        self.path = path
+        self.maxEntries = maxEntries
+        self.flushSize = flushSize
+        self.db = sqlite3.connect(path, timeout=600)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS certs (key BLOB PRIMARY KEY, cert BLOB NOT NULL, used REAL NOT NULL) WITHOUT ROWID")
+        self.db.execute("CREATE INDEX IF NOT EXISTS certsUsed ON certs (used)")
+        version = self.db.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if version is None or version[0] != str(isomorphisms.CERTIFICATE_VERSION):
+            self.db.execute("DELETE FROM certs")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(isomorphisms.CERTIFICATE_VERSION),))
+        self.db.commit()
+        #kept in memory so inserts don't have to COUNT(*) the table;
+        #other processes sharing the file make this approximate
+        self.entries = self.db.execute("SELECT COUNT(*) FROM certs").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        #new certificates and LRU touches wait here until flush, so a
+        #batch of lookups costs one transaction instead of one each
+        self.pending = {}
+        self.touched = set()
+
+    def getMany(self, keys: list[bytes]) -> dict[bytes, tuple[int, ...]]:
+        """
+        Bulk lookup. Returns the certificates of the keys that are cached,
+        including ones stored since the last flush. Marking the stored
+        ones as recently used is left to flush.
+        """
+        found = {key: self.pending[key] for key in keys if key in self.pending}
+        unique = [key for key in set(keys) if key not in found]
+        #stays under sqlite's limit on query parameters
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start+500]
+            query = "SELECT key, cert FROM certs WHERE key IN (" + ",".join("?"*len(chunk)) + ")"
+            for key, cert in self.db.execute(query, chunk):
+                found[key] = unpackRows(cert)
+                self.touched.add(key)
+        return found
+
+    def putMany(self, items: dict[bytes, tuple[int, ...]]) -> None:
+        """
+        Bulk insert. The items are written by the next flush.
+        """
+        self.pending.update(items)
+        if len(self.pending) >= self.flushSize:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the pending certificates and LRU touches in one
+        transaction, then evicts the least recently used entries if the
+        cache has grown past maxEntries. Keys another process stored in
+        the meantime are left alone and not counted as new entries.
+        """
+        if not self.pending and not self.touched:
+            return
+        now = time.time()
+        before = self.db.total_changes
+        self.db.executemany("INSERT OR IGNORE INTO certs VALUES (?, ?, ?)",
+                            [(key, packRows(cert), now) for key, cert in self.pending.items()])
+        self.entries += self.db.total_changes - before
+        self.db.executemany("UPDATE certs SET used = ? WHERE key = ?", [(now, key) for key in self.touched])
+        self.pending = {}
+        self.touched = set()
+        if self.entries > self.maxEntries:
+            #evicts down to 90% so eviction doesn't run on every insert
+            excess = self.entries - self.maxEntries*9//10
+            self.db.execute("DELETE FROM certs WHERE key IN (SELECT key FROM certs ORDER BY used LIMIT ?)", (excess,))
+            self.entries = self.db.execute("SELECT COUNT(*) FROM certs").fetchone()[0]
+        self.db.commit()
+
+    def key(self, rows: list[int]) -> bytes:
+        return packRows(rows)
+
+    def lookup(self, keys: list[bytes], compute) -> list[tuple[int, ...]]:
+        """
+        Certificates for many keys at once: one bulk lookup, then
+        compute(i) for the ith key on a miss. Computed certificates are
+        stored.
+        """
+        found = self.getMany(keys)
+        computed = {}
+        certs = []
+        for i in range(len(keys)):
+            if keys[i] in found:
+                self.hits += 1
+                certs.append(found[keys[i]])
+            elif keys[i] in computed:
+                certs.append(computed[keys[i]])
+            else:
+                self.misses += 1
+                computed[keys[i]] = compute(i)
+                certs.append(computed[keys[i]])
+        self.putMany(computed)
+        return certs
+
+    def certificates(self, graphs: list[Graph], parts: list[list[list[int]]] = None) -> list[tuple[int, ...]]:
+        """
+        Certificates of many graphs at once through lookup, with
+        isomorphisms.certificate for the misses. parts optionally holds
+        each graph's initPartition.
+        """
+        keys = [packRows(isomorphisms.adjacencyRows(g)) for g in graphs]
+        return self.lookup(keys, lambda i: isomorphisms.certificate(graphs[i], None if parts is None else parts[i]))
+
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+
+#Unit tests
+def test_packRows():
+    rows = (0b0110, 0b1001, 0b1001, 0b0110)
+    assert packRows(rows) == bytes([4, 0b110011])
+    assert unpackRows(packRows(rows)) == rows
+    assert unpackRows(packRows(())) == ()
+
+def test_CertificateCache():
+    import os, tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        graphs = [Graph.cycle(5), Graph.cycle(5, 2), Graph.cycle(6)]
+        cache = CertificateCache(os.path.join(folder, "certs.sqlite"))
+        assert cache.certificates(graphs) == [isomorphisms.certificate(g) for g in graphs]
+        assert cache.misses == 3 and cache.entries == 0
+        assert cache.certificates(graphs[:1]) == [isomorphisms.certificate(graphs[0])] and cache.hits == 1
+        cache.flush()
+        assert cache.entries == 3
+        #rewriting stored keys doesn't count as new entries
+        cache.putMany({packRows(isomorphisms.adjacencyRows(graphs[0])): isomorphisms.certificate(graphs[0])})
+        cache.flush()
+        assert cache.entries == 3
+        cache.close()
+        cache = CertificateCache(os.path.join(folder, "certs.sqlite"))
+        assert cache.certificates(graphs[2:]) == [isomorphisms.certificate(graphs[2])]
+        assert cache.hits == 1 and cache.misses == 0
+        cache.close()
+        cache = CertificateCache(os.path.join(folder, "small.sqlite"), maxEntries=2)
+        cache.certificates(graphs)
+        assert cache.entries <= 2
+        cache.close()
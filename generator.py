@@ -1,5 +1,15 @@
 import sys
-from Graph import Graph
+from math import comb
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from itertools import combinations, islice
+from Graph import Graph, BitGraph
+import isomorphisms
+#NumPy is only needed for the batched (vectorized) paths
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 def bitCount(n: int) -> int:
     """
@@ -23,6 +33,121 @@ def genSpecs(vertices: int) -> list[list[int]]:
         specs[bitCount(i)].append(i)
     return specs
 
+class SubproblemTable:
+    def __init__(self, maxEntries: int = 1000000, maxSolutions: int = 100000, solutionVertices: int = 6) -> None:
+        """
+        Memo of residual subproblems of the genValid recursion. Once some
+        rows are fixed, what is left is to fill in a graph on the
+        remaining vertices with the remaining degrees, and many prefixes
+        leave the same residual. The number of such graphs doesn't depend
+        on the order of the degrees (relabeling the vertices maps one
+        onto the other), so counts are keyed by the sorted nonzero
+        degrees, and a count of 0 means the branch is infeasible. The
+        descriptions of residuals on at most solutionVertices vertices
+        are also kept, keyed by the exact degree tuple since they depend
+        on the order. Both tables drop their least recently used entries
+        past maxEntries and maxSolutions.
+        """
+        self.maxEntries = maxEntries
+        self.maxSolutions = maxSolutions
+        self.solutionVertices = solutionVertices
+        self.counts = OrderedDict()
+        self.solved = OrderedDict()
+        self.solvedRows = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, degrees: list[int]) -> int:
+        """
+        Number of labeled graphs with exactly this degree sequence, found
+        without building any of them: the largest degree is joined to
+        every possible number of vertices from each group of equal
+        degree, comb(group size, number) ways each, and the rest is
+        counted the same way.
+        """
+        key = tuple(sorted((d for d in degrees if d), reverse=True))
+        return self.countKey(key)
+
+    def countKey(self, key: tuple[int, ...]) -> int:
+        if key in self.counts:
+            self.hits += 1
+            self.counts.move_to_end(key)
+            return self.counts[key]
+        self.misses += 1
+        if not key:
+            total = 1
+        elif sum(key) % 2 or key[0] >= len(key):
+            total = 0
+        else:
+            groups = []
+            for d in key[1:]:
+                if groups and groups[-1][0] == d:
+                    groups[-1][1] += 1
+                else:
+                    groups.append([d, 1])
+            total = 0
+            #picks how many vertices of each group the first vertex joins
+            def split(group: int, remaining: int, ways: int, residual: list[int]) -> None:
+                nonlocal total
+                if remaining == 0:
+                    for d, size in groups[group:]:
+                        residual += [d]*size
+                    total += ways * self.countKey(tuple(sorted((d for d in residual if d), reverse=True)))
+                    return
+                if group == len(groups):
+                    return
+                d, size = groups[group]
+                for taken in range(min(size, remaining) + 1):
+                    split(group + 1, remaining - taken, ways * comb(size, taken), residual + [d - 1]*taken + [d]*(size - taken))
+            split(0, key[0], 1, [])
+        self.counts[key] = total
+        if len(self.counts) > self.maxEntries:
+            self.counts.popitem(last=False)
+        return total
+
+    def feasible(self, degrees: list[int]) -> bool:
+        return self.count(degrees) > 0
+
+    def solutions(self, vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[tuple[int, ...]]:
+        """
+        Every description of the residual, as iterValid would yield it
+        with no prefix, remembered for small residuals.
+        """
+        key = tuple(degrees)
+        if key in self.solved:
+            self.solved.move_to_end(key)
+            return self.solved[key]
+        solved = list(iterValid(vertices, degrees, possibilities))
+        self.solved[key] = solved
+        if len(self.solved) > self.maxSolutions:
+            self.solved.popitem(last=False)
+        return solved
+
+    def solutionRows(self, vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[list[int]]:
+        """
+        The bitset rows of each of solutions' descriptions, in the same
+        order and remembered the same way.
+        """
+        key = tuple(degrees)
+        if key in self.solvedRows:
+            self.solvedRows.move_to_end(key)
+            return self.solvedRows[key]
+        rows = [descriptionRows(vertices, suffix) for suffix in self.solutions(vertices, degrees, possibilities)]
+        self.solvedRows[key] = rows
+        if len(self.solvedRows) > self.maxSolutions:
+            self.solvedRows.popitem(last=False)
+        return rows
+
+#Shared by every search in the process
+subproblems = SubproblemTable()
+
+def countValid(vertices: int, degrees: list[int]) -> int:
+    """
+    Number of descriptions genValid would return for the class, without
+    generating them.
+    """
+    return subproblems.count(degrees)
+
 def genValid(vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[list[int]]:
     """
     Uses the number of vertices and the degree sequence to create all the 
@@ -30,55 +155,422 @@ def genValid(vertices: int, degrees: list[int], possibilities: list[list[int]])
     are based on the upper triangle of an adjacency matrix and are the 
     decimal conversions of those binary strings.
     """
-    valid = [[]]
+    valid = [list(description) for description in iterValid(vertices, degrees, possibilities)]
+    #no valid cases keeps the old [[]] marker
+    if not valid:
+        return [[]]
+    return valid
+
+def iterValid(vertices: int, degrees: list[int], possibilities: list[list[int]], prefix: tuple[int, ...] = (), vectorized: bool = False, connected: bool = False, components: list[int] = None) -> Iterator[tuple[int, ...]]:
+    """
+    Lazily yields genValid's descriptions, in the same order, as tuples
+    starting with prefix. connected drops disconnected graphs as their
+    branches close (components carries a branch's labels), and
+    vectorized filters large row buckets through batchRows.
+    """
+    if connected and components is None:
+        components = prefixComponents(len(prefix) + vertices, prefix)
+        if closedComponent(components, len(prefix), degrees):
+            return
+
     #Base case
     if vertices == 2:
         #2 valid forms
         if degrees[0] == 1 and degrees[1] == 1:
-            return [[1]]
+            num = 1
         elif degrees[0] == 0 and degrees[1] == 0:
-            return [[0]]
-        #invalid cases
+            num = 0
+        #invalid cases yield nothing
         else:
-            return [[]]
-    
+            return
+        if connected and len(set(joinRow(components, len(prefix), 2, num))) > 1:
+            return
+        yield prefix + (num,)
+        return
+
     #Recursive case
+    #NumPy's per-call overhead only pays off on big buckets, so
+    #the small levels near the leaves stay in pure Python
+    if vectorized and np is not None and comb(vertices - 1, degrees[0]) >= 256:
+        rows = batchRows(vertices, degrees, possibilities)
     else:
-        #Pulls all integers s.t. the bitcount matches the degree of the 
-        #first vertex remaining
-        pool = possibilities[degrees[0]]
-
-        #iteration over these
-        for num in pool:
-            #preventing integers above our max size
-            if num > pow(2, vertices - 1) - 1:
-                break
-            #determining how to change the current remaining degree sequence
-            modDegrees = [degrees[i] - (num >> (vertices - i - 1))%2 for i in range(1, vertices)]
-            #passing over invalid cases
-            if -1 in modDegrees:
-                pass
-            #remaining cases
-            else:
-                lower = genValid(vertices - 1, modDegrees, possibilities)
-                #more filtering (no valid cases for the remaining vertices)
-                if lower == [[]]:
-                    pass
-                else:
-                    #cleaning up
-                    if valid[0] == []:
-                        valid.pop(0)
-                    #adding the current number to the front of all arrays
-                    #generated from the remaining degree sequence and
-                    #and appending these to the current valid cases
-                    for validVec in lower:
-                        validVec.insert(0, num)
-                        valid.append(validVec)
-
-        #pushing the valid cases back up the chain or out to the rest of
-        #the program
-        return valid
+        rows = firstRows(vertices, degrees, possibilities)
+    for num, modDegrees in rows:
+        #a residual with no completions is cut here instead of levels down
+        if not subproblems.feasible(modDegrees):
+            continue
+        modComponents = None
+        if connected:
+            modComponents = joinRow(components, len(prefix), vertices, num)
+            if closedComponent(modComponents, len(prefix) + 1, modDegrees, len(prefix)):
+                continue
+        if vertices - 1 <= subproblems.solutionVertices:
+            suffixes = subproblems.solutions(vertices - 1, modDegrees, possibilities)
+            if connected:
+                suffixes = connectedSuffixes(modComponents, len(prefix) + 1, suffixes, subproblems.solutionRows(vertices - 1, modDegrees, possibilities))
+            for suffix in suffixes:
+                yield prefix + (num,) + suffix
+            continue
+        yield from iterValid(vertices - 1, modDegrees, possibilities, prefix + (num,), vectorized=vectorized, connected=connected, components=modComponents)
+
+def joinRow(components: list[int], first: int, vertices: int, num: int) -> list[int]:
+    """
+    Component labels after adding the row num of vertex first, where
+    vertices counts first and the vertices after it.
+    """
+    merged = {components[first]}
+    for i in range(1, vertices):
+        if (num >> (vertices - i - 1)) % 2:
+            merged.add(components[first + i])
+    label = min(merged)
+    return [label if component in merged else component for component in components]
+
+def prefixComponents(total: int, prefix: tuple[int, ...]) -> list[int]:
+    """
+    Component labels of the edges fixed by the rows of prefix.
+    """
+    components = list(range(total))
+    for first in range(len(prefix)):
+        components = joinRow(components, first, total - first, prefix[first])
+    return components
+
+def closedComponent(components: list[int], first: int, degrees: list[int], vertex: int = None) -> bool:
+    """
+    Every vertex before first has its row fixed, and degrees holds the
+    remaining degrees of the rest. A component none of whose vertices
+    has degree left can't grow any more, so unless it already covers
+    the whole graph the finished graph is disconnected. Checks only the
+    component of vertex when it's given.
+    """
+    if len(set(components)) == 1:
+        return False
+    labels = set(components) if vertex is None else {components[vertex]}
+    for label in labels:
+        if all(degrees[v - first] == 0 for v in range(first, len(components)) if components[v] == label):
+            return True
+    return False
+
+def connectedSuffixes(components: list[int], first: int, suffixes: list[tuple[int, ...]], suffixRows: list[list[int]]) -> list[tuple[int, ...]]:
+    """
+    The suffixes, descriptions of the vertices from first on with their
+    bitset rows in suffixRows, that finish a connected graph when the
+    fixed rows before first left the component labels components.
+    """
+    size = len(components) - first
+    #vertices sharing a component are already joined through the fixed rows
+    masks = {}
+    for v in range(size):
+        masks[components[first + v]] = masks.get(components[first + v], 0) | 1 << v
+    if len(masks) < len(set(components)):
+        return []
+    joined = [masks[components[first + v]] for v in range(size)]
+    return [suffix for suffix, rows in zip(suffixes, suffixRows) if isConnected([row | join for row, join in zip(rows, joined)])]
+
+def reach(rows: list[int], seed: int) -> int:
+    """
+    Mask of the vertices reachable from those in seed, by breadth-first
+    search over bitset adjacency rows, one OR per reached vertex.
+    """
+    reached = frontier = seed
+    while frontier:
+        grown = 0
+        while frontier:
+            low = frontier & -frontier
+            grown |= rows[low.bit_length() - 1]
+            frontier ^= low
+        frontier = grown & ~reached
+        reached |= frontier
+    return reached
+
+def isConnected(rows: list[int]) -> bool:
+    """
+    Connectivity of the graph given by bitset adjacency rows.
+    """
+    return len(rows) == 0 or reach(rows, 1) == (1 << len(rows)) - 1
+
+def batchConnected(vertices: int, descriptions: list[tuple[int, ...]]) -> list[bool]:
+    """
+    Connectivity of many descriptions at once. With NumPy this squares
+    the reachability matrices of the whole batch log2(vertices) times;
+    without it each description gets its own bitset search. The search
+    itself doesn't need it, since iterValid's connected mode never
+    yields a disconnected graph; it is kept for checking descriptions
+    from elsewhere.
+    """
+    if np is None:
+        return [isConnected(descriptionRows(vertices, description)) for description in descriptions]
+    if len(descriptions) == 0:
+        return []
+    reach = decodeBatch(vertices, descriptions).astype(np.int32) | np.eye(vertices, dtype=np.int32)
+    steps = 1
+    while steps < vertices:
+        reach = (reach @ reach > 0).astype(np.int32)
+        steps *= 2
+    return reach[:, 0, :].all(axis=1).tolist()
+
+def firstRows(vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[tuple[int, list[int]]]:
+    """
+    Returns every candidate first row of the upper triangle together with
+    the degree sequence it leaves for the remaining vertices. Each branch
+    can be expanded on its own with genValid(vertices - 1, modDegrees,
+    possibilities), which is how the search is split across processes.
+    """
+    rows = []
+    #Pulls all integers s.t. the bitcount matches the degree of the 
+    #first vertex remaining
+    pool = possibilities[degrees[0]]
+
+    #iteration over these
+    for num in pool:
+        #preventing integers above our max size
+        if num > pow(2, vertices - 1) - 1:
+            break
+        #determining how to change the current remaining degree sequence
+        modDegrees = [degrees[i] - (num >> (vertices - i - 1))%2 for i in range(1, vertices)]
+        #passing over invalid cases
+        if -1 not in modDegrees:
+            rows.append((num, modDegrees))
+    return rows
     
+def filterBucket(vertices: int, degrees: list[int], bucket: list[int]) -> tuple:
+    """
+    Vectorized form of the check in firstRows. Takes a whole bucket of
+    candidate first rows and returns, as NumPy arrays, the rows that fit
+    and the remaining degree sequence each one leaves (one per line).
+    """
+    nums = np.asarray(bucket, dtype=np.int64)
+    nums = nums[nums < (1 << (vertices - 1))]
+    #column i - 1 holds the bit of vertex i
+    shifts = np.arange(vertices - 2, -1, -1, dtype=np.int64)
+    bits = (nums[:, None] >> shifts) & 1
+    modDegrees = np.asarray(degrees[1:], dtype=np.int64) - bits
+    keep = (modDegrees >= 0).all(axis=1)
+    return nums[keep], modDegrees[keep]
+
+def batchRows(vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[tuple[int, list[int]]]:
+    """
+    Same result as firstRows, computed with filterBucket.
+    """
+    nums, modDegrees = filterBucket(vertices, degrees, possibilities[degrees[0]])
+    return list(zip(nums.tolist(), modDegrees.tolist()))
+
+def decodeBatch(vertices: int, descriptions: list[tuple[int, ...]]):
+    """
+    Decodes many descriptions at once into a (graphs, vertices,
+    vertices) NumPy array of 0/1 adjacency matrices, the batched
+    counterpart of individual.
+    """
+    described = np.asarray(descriptions, dtype=np.int64).reshape(-1, vertices - 1)
+    #entry [i, j] is the shift that reads edge (i, j) out of row i
+    shifts = vertices - 1 - np.arange(vertices, dtype=np.int64)[None, :]
+    upper = np.triu(np.ones((vertices - 1, vertices), dtype=bool), 1)
+    bits = (described[:, :, None] >> np.where(upper, shifts, 0)) & 1
+    adjacency = np.zeros((len(described), vertices, vertices), dtype=np.uint8)
+    adjacency[:, :vertices - 1, :] = np.where(upper, bits, 0)
+    return adjacency | adjacency.transpose(0, 2, 1)
+
+def batchBitRows(vertices: int, descriptions: list[tuple[int, ...]]):
+    """
+    Decodes many descriptions into BitGraph style rows, one uint64 per
+    vertex (bit j of row i set when i and j are adjacent).
+    """
+    adjacency = decodeBatch(vertices, descriptions).astype(np.uint64)
+    return (adjacency << np.arange(vertices, dtype=np.uint64)).sum(axis=2, dtype=np.uint64)
+
+def statePartition(closed: int, targets: list[int]) -> list[list[int]]:
+    """
+    Ordered partition of a partial graph whose first closed vertices
+    have their rows fixed: closed vertices before open ones, each split
+    by target degree, largest first. Any isomorphism between two such
+    partial graphs preserves it.
+    """
+    cells = {}
+    for vert in range(len(targets)):
+        cells.setdefault((vert >= closed, -targets[vert]), []).append(vert)
+    return [cells[key] for key in sorted(cells)]
+
+def deadComponent(rows: list[int], alive: int) -> bool:
+    """
+    True if some component of the fixed edges, short of the whole
+    graph, has no vertex in alive (the vertices with degree left), so
+    it can't grow and the finished graph is disconnected.
+    """
+    full = (1 << len(rows)) - 1
+    unseen = full
+    while unseen:
+        reached = reach(rows, unseen & -unseen)
+        if reached == full:
+            return False
+        if not reached & alive:
+            return True
+        unseen &= ~reached
+    return False
+
+def canonicalChildren(rows: list[int], closed: int, targets: list[int], generators: list[list[int]], connected: bool = False) -> Iterator[tuple[list[int], list[list[int]]]]:
+    """
+    Canonical augmentation step. The partial graph given by rows, with
+    its first closed vertices closed and generators spanning its
+    automorphism group, is extended by closing one more vertex of
+    degree targets[closed], one augmentation per orbit of the group,
+    and the closed vertex is relabeled to position closed. A child is
+    kept only if that vertex is in the orbit of its canonical last
+    vertex: among the closed vertices of the same degree, the ones with
+    the most edges to open vertices, and of those the one placed first
+    by isomorphisms.search. Every isomorphism class is then reached
+    exactly once. Yields the kept children with their automorphism
+    generators (None for complete graphs, which aren't extended).
+    """
+    size = len(rows)
+    full = (1 << size) - 1
+    residual = [targets[v] - bin(rows[v]).count("1") for v in range(size)]
+    #augmentations are (vertex to close, its new neighbors) pairs
+    seen = set()
+    for vert in range(closed, size):
+        if targets[vert] != targets[closed]:
+            continue
+        choices = [v for v in range(closed, size) if v != vert and residual[v] > 0]
+        for chosen in combinations(choices, residual[vert]):
+            mask = sum(1 << v for v in chosen)
+            if (vert, mask) in seen:
+                continue
+            orbit = [(vert, mask)]
+            seen.add((vert, mask))
+            for image, imageMask in orbit:
+                for gen in generators:
+                    moved = (gen[image], sum(1 << gen[v] for v in range(size) if (imageMask >> v) & 1))
+                    if moved not in seen:
+                        seen.add(moved)
+                        orbit.append(moved)
+            child = list(rows)
+            child[vert] |= mask
+            for v in chosen:
+                child[v] |= 1 << vert
+            if vert != closed:
+                child = swapVertices(child, vert, closed)
+            left = [targets[v] - bin(child[v]).count("1") for v in range(closed + 1, size)]
+            if not subproblems.feasible(left):
+                continue
+            if connected and deadComponent(child, sum(1 << v for v in range(closed + 1, size) if left[v - closed - 1])):
+                continue
+            #the cheap half of the test: the new vertex must have the most open neighbors
+            openMask = full & ~((1 << (closed + 1)) - 1)
+            reach = {v: bin(child[v] & openMask).count("1") for v in range(closed + 1) if targets[v] == targets[closed]}
+            most = max(reach.values())
+            if reach[closed] < most:
+                continue
+            tied = [v for v in reach if reach[v] == most]
+            if len(tied) == 1 and closed + 1 == size:
+                yield child, None
+                continue
+            labeling, form, childGenerators = isomorphisms.search(BitGraph.fromRows(child), statePartition(closed + 1, targets))
+            last = [v for v in labeling if v in tied][0]
+            childParents = isomorphisms.orbitRoots(size, childGenerators)
+            if isomorphisms.find(childParents, last) == isomorphisms.find(childParents, closed):
+                yield child, childGenerators
+
+def swapVertices(rows: list[int], vertex1: int, vertex2: int) -> list[int]:
+    """
+    The rows with the labels of two vertices exchanged.
+    """
+    swapped = []
+    for row in rows:
+        bits = ((row >> vertex1) & 1) << vertex2 | ((row >> vertex2) & 1) << vertex1
+        swapped.append(row & ~((1 << vertex1) | (1 << vertex2)) | bits)
+    swapped[vertex1], swapped[vertex2] = swapped[vertex2], swapped[vertex1]
+    return swapped
+
+def iterCanonical(rows: list[int], closed: int, targets: list[int], generators: list[list[int]], connected: bool = False) -> Iterator[tuple[int, ...]]:
+    """
+    Descriptions of the completions of a partial graph produced by
+    canonicalChildren (or of the empty one), one per isomorphism class.
+    """
+    if closed == len(rows):
+        yield rowsDescription(rows)
+        return
+    for child, childGenerators in canonicalChildren(rows, closed, targets, generators, connected):
+        yield from iterCanonical(child, closed + 1, targets, childGenerators, connected)
+
+def iterCanonicalClass(vertices: int, degrees: list[int], connected: bool = False) -> Iterator[tuple[int, ...]]:
+    """
+    Yields one description for every isomorphism class among those
+    iterValid yields for the same arguments, by canonical augmentation.
+    """
+    for state in canonicalStates(vertices, degrees, 1, connected):
+        yield from iterCanonical(*state, connected)
+
+def canonicalStates(vertices: int, degrees: list[int], count: int, connected: bool = False) -> list[tuple[list[int], int, list[int], list[list[int]]]]:
+    """
+    Splits the canonical augmentation of a class into about count
+    partial graphs (fewer if the class runs out), as (rows, closed,
+    targets, generators) states for iterCanonical. States are expanded
+    in place by canonicalChildren, so their completions, taken in
+    order, are exactly iterCanonicalClass's.
+    """
+    rows = [0 for _ in range(vertices)]
+    generators = isomorphisms.search(BitGraph.fromRows(rows), statePartition(0, degrees))[2]
+    states = [(rows, 0, degrees, generators)]
+    while len(states) < count and any(closed < vertices for rows, closed, targets, generators in states):
+        expanded = []
+        for i in range(len(states)):
+            rows, closed, targets, generators = states[i]
+            if closed == vertices or len(expanded) + len(states) - i >= count:
+                expanded.append(states[i])
+            else:
+                expanded.extend((child, closed + 1, targets, childGenerators) for child, childGenerators in canonicalChildren(rows, closed, targets, generators, connected))
+        states = expanded
+    return states
+
+def descriptionRows(vertices: int, description: tuple[int, ...]) -> list[int]:
+    """
+    Decodes a description straight into bitset rows.
+    """
+    rows = [0 for _ in range(vertices)]
+    for i in range(len(description)):
+        for j in range(i + 1, vertices):
+            if (description[i] >> (vertices - j - 1)) % 2:
+                rows[i] |= 1 << j
+                rows[j] |= 1 << i
+    return rows
+
+def rowsDescription(rows: list[int]) -> tuple[int, ...]:
+    """
+    Inverse of descriptionRows.
+    """
+    size = len(rows)
+    return tuple(sum(1 << (size - j - 1) for j in range(i + 1, size) if (rows[i] >> j) & 1) for i in range(size - 1))
+
+def batchGraphs(vertices: int, descriptions: list[tuple[int, ...]]) -> list[Graph]:
+    """
+    Builds the graphs of many descriptions at once from decodeBatch,
+    the same graphs individual builds one at a time, with neighbors
+    in ascending order.
+    """
+    graphs = [Graph(vertices) for _ in descriptions]
+    if len(descriptions) == 0:
+        return graphs
+    #nonzero walks the matrices in order, so every list comes out sorted
+    which, vertex, neighbor = np.nonzero(decodeBatch(vertices, descriptions))
+    for g, v1, v2 in zip(which.tolist(), vertex.tolist(), neighbor.tolist()):
+        graphs[g].vertices[v1].append(v2)
+    return graphs
+
+def iterGraphs(vertices: int, descriptions: Iterable[tuple[int, ...]], vectorized: bool = False, batchSize: int = 1024) -> Iterator[tuple[tuple[int, ...], Graph]]:
+    """
+    Pairs every description with its graph. With vectorized set (and
+    NumPy installed) the descriptions are decoded batchSize at a time
+    through batchGraphs, otherwise one at a time through individual.
+    """
+    if not vectorized or np is None:
+        for description in descriptions:
+            yield description, individual(vertices, description)
+        return
+    descriptions = iter(descriptions)
+    while True:
+        batch = list(islice(descriptions, batchSize))
+        if not batch:
+            return
+        yield from zip(batch, batchGraphs(vertices, batch))
+
 def individual(vertices: int, description: list[int]) -> Graph:
     """
     Generating a graph from its description list
@@ -90,20 +582,40 @@ def individual(vertices: int, description: list[int]) -> Graph:
                 indiv.addEdge(i, j)
     return indiv
 
-#Might split into a bidegreed deg seq generator and a fcn that generates
-#the class having a specific sequence. Also planning on adding in 
-#isomorphism checking once the module for that has been built.
+def genClass(vertices: int, degrees: list[int], possibilities: list[list[int]]) -> list[Graph]:
+    """
+    Generates all valid graphs with the given deg sequence.
+    """
+    return list(iterClass(vertices, degrees, possibilities))
+
+def iterClass(vertices: int, degrees: list[int], possibilities: list[list[int]], breakSymmetry: bool = False, vectorized: bool = False, connected: bool = False) -> Iterator[Graph]:
+    """
+    Streaming form of genClass that builds each graph only when it is
+    asked for. With breakSymmetry set, one graph is built per
+    isomorphism class (see iterCanonicalClass), and with connected set,
+    no disconnected graph is. With vectorized set, graphs are decoded
+    in batches (see iterGraphs).
+    """
+    if breakSymmetry:
+        descriptions = iterCanonicalClass(vertices, degrees, connected=connected)
+    else:
+        descriptions = iterValid(vertices, degrees, possibilities, vectorized=vectorized, connected=connected)
+    for description, graph in iterGraphs(vertices, descriptions, vectorized):
+        yield graph
+
 def genBiClass(vertices: int, numDeg1: int, deg1: int, deg2: int, possibilities: list[list[int]]) -> list[Graph]:
     """
     The only part of the program specific to bidegreed graphs.
     Generates all valid graphs with the specified deg sequence.
     """
-    biClass = []
+    return list(iterBiClass(vertices, numDeg1, deg1, deg2, possibilities))
+
+def iterBiClass(vertices: int, numDeg1: int, deg1: int, deg2: int, possibilities: list[list[int]], breakSymmetry: bool = False, vectorized: bool = False, connected: bool = False) -> Iterator[Graph]:
+    """
+    Streaming form of genBiClass, see iterClass.
+    """
     degrees = [deg1 for i in range(numDeg1)] + [deg2 for i in range(vertices - numDeg1)]
-    valid = genValid(vertices, degrees, possibilities)
-    for validVec in valid:
-        biClass.append(individual(vertices, validVec))
-    return biClass
+    return iterClass(vertices, degrees, possibilities, breakSymmetry, vectorized, connected)
 
 #Unit tests
 def test_bitCount():
@@ -125,11 +637,78 @@ def test_genValid():
     assert genValid(3, [1, 2, 1], genSpecs(3)) == [[2, 1]]
     assert genValid(4, [1, 1, 1, 1], genSpecs(4)) == [[1, 2, 0], [2, 1, 0], [4, 0, 1]]
 
+def test_iterValid():
+    for vertices, degrees in [(4, [1, 1, 1, 1]), (5, [2, 2, 2, 1, 1]), (6, [3, 3, 2, 2, 2, 2])]:
+        assert [list(d) for d in iterValid(vertices, degrees, genSpecs(vertices))] == genValid(vertices, degrees, genSpecs(vertices))
+    assert list(iterValid(3, [1, 1, 1], genSpecs(3))) == []
+    assert next(iterValid(4, [1, 1, 1, 1], genSpecs(4), (9,))) == (9, 1, 2, 0)
+
+def test_SubproblemTable():
+    table = SubproblemTable(maxEntries=4, maxSolutions=2)
+    assert table.count([3, 3, 2, 2, 2, 2]) == 54 and table.count([2, 2, 3, 2, 3, 2]) == 54
+    assert table.count([3, 3, 1, 1]) == 0 and not table.feasible([1, 1, 1])
+    assert len(table.counts) <= 4
+    for vertices, degrees in [(4, [1, 1, 1, 1]), (5, [2, 2, 2, 1, 1]), (5, [1, 2, 2, 1, 2])]:
+        assert table.solutions(vertices, degrees, genSpecs(vertices)) == list(iterValid(vertices, degrees, genSpecs(vertices)))
+    assert len(table.solved) == 2
+    assert table.solutionRows(4, [1, 1, 1, 1], genSpecs(4)) == [descriptionRows(4, d) for d in iterValid(4, [1, 1, 1, 1], genSpecs(4))]
+    assert countValid(8, [3, 3, 3, 3, 3, 3, 2, 2]) == 10095
+    assert countValid(7, [4, 4, 4, 4, 4, 4, 3]) == 0
+
+def test_canonical():
+    for vertices, degrees in [(4, [1, 1, 1, 1]), (6, [3, 3, 2, 2, 2, 2]), (7, [3, 3, 2, 2, 2, 1, 1]), (7, [4, 4, 3, 3, 3, 3, 2])]:
+        full = {isomorphisms.certificate(individual(vertices, d)) for d in iterValid(vertices, degrees, genSpecs(vertices))}
+        canonical = [isomorphisms.certificate(individual(vertices, d)) for d in iterCanonicalClass(vertices, degrees)]
+        assert len(canonical) == len(full) and set(canonical) == full
+    for count in [1, 2, 3, 8]:
+        branches = [d for state in canonicalStates(7, [3, 3, 2, 2, 2, 2, 2], count) for d in iterCanonical(*state)]
+        assert branches == list(iterCanonicalClass(7, [3, 3, 2, 2, 2, 2, 2]))
+    assert len(canonicalStates(7, [3, 3, 2, 2, 2, 2, 2], 8)) >= 8
+    assert swapVertices([6, 1, 1], 0, 1) == [2, 5, 2] and rowsDescription(descriptionRows(5, (9, 4, 3, 1))) == (9, 4, 3, 1)
+
+def test_firstRows():
+    assert firstRows(4, [1, 1, 1, 1], genSpecs(4)) == [(1, [1, 1, 0]), (2, [1, 0, 1]), (4, [0, 1, 1])]
+    assert firstRows(4, [2, 1, 1, 0], genSpecs(4)) == [(6, [0, 0, 0])]
+
+def test_batch():
+    if np is None:
+        return
+    for vertices, degrees in [(4, [1, 1, 1, 1]), (6, [3, 3, 2, 2, 2, 2]), (7, [4, 4, 3, 3, 3, 3, 2])]:
+        possibilities = genSpecs(vertices)
+        assert batchRows(vertices, degrees, possibilities) == firstRows(vertices, degrees, possibilities)
+        assert list(iterValid(vertices, degrees, possibilities, vectorized=True)) == list(iterValid(vertices, degrees, possibilities))
+        descriptions = list(iterValid(vertices, degrees, possibilities))
+        for description, matrix, rows in zip(descriptions, decodeBatch(vertices, descriptions), batchBitRows(vertices, descriptions)):
+            graph = individual(vertices, description)
+            assert [[j for j in range(vertices) if matrix[i][j]] for i in range(vertices)] == graph.vertices
+            assert [int(row) for row in rows] == [sum(1 << j for j in adjacent) for adjacent in graph.vertices]
+        assert [graph.vertices for graph in batchGraphs(vertices, descriptions)] == [individual(vertices, description).vertices for description in descriptions]
+        assert [graph.vertices for graph in iterClass(vertices, degrees, possibilities, vectorized=True)] == [graph.vertices for graph in iterClass(vertices, degrees, possibilities)]
+
+def test_connected():
+    for vertices, degrees in [(6, [2, 2, 2, 2, 2, 2]), (6, [3, 3, 2, 2, 2, 2]), (7, [3, 3, 2, 2, 2, 1, 1]), (5, [2, 2, 2, 1, 1])]:
+        possibilities = genSpecs(vertices)
+        descriptions = list(iterValid(vertices, degrees, possibilities))
+        flags = batchConnected(vertices, descriptions)
+        assert flags == [isConnected(descriptionRows(vertices, d)) for d in descriptions]
+        assert list(iterValid(vertices, degrees, possibilities, connected=True)) == [d for d, flag in zip(descriptions, flags) if flag]
+        full = {isomorphisms.certificate(individual(vertices, d)) for d, flag in zip(descriptions, flags) if flag}
+        canonical = [isomorphisms.certificate(individual(vertices, d)) for d in iterCanonicalClass(vertices, degrees, connected=True)]
+        assert len(canonical) == len(full) and set(canonical) == full
+    assert list(iterValid(2, [1, 1], genSpecs(2), connected=True)) == [(1,)]
+    assert list(iterValid(2, [0, 0], genSpecs(2), connected=True)) == []
+    assert isConnected([]) and not isConnected([0, 0])
+    assert reach([2, 1, 8, 4], 1) == 3 and reach([2, 1, 8, 4], 5) == 15
+
 def test_individual():
     assert individual(4, [1, 2, 0]).vertices == [[3], [2], [1], [0]]
     assert individual(4, [4, 0, 1]).vertices == [[1], [0], [3], [2]]
     assert individual(4, [7, 3, 1]).vertices == [[1, 2, 3], [0, 2, 3], [0, 1, 3], [0, 1, 2]]
 
+def test_genClass():
+    assert [graph.vertices for graph in genClass(4, [3, 1, 1, 1], genSpecs(4))] == [[[1, 2, 3], [0], [0], [0]]]
+    assert genClass(4, [3, 3, 1, 1], genSpecs(4)) == []
+
 def test_genBiClass():
     assert [graph.vertices for graph in genBiClass(4, 2, 2, 1, genSpecs(4))] == [[[1, 3], [0, 2], [1], [0]], [[1, 2], [0, 3], [0], [1]]]  
     assert [graph.vertices for graph in genBiClass(4, 2, 3, 2, genSpecs(4))] == [[[1, 2, 3], [0, 2, 3], [0, 1], [0, 1]]]
\ No newline at end of file
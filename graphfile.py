@@ -0,0 +1,126 @@
+import gzip, io, struct, argparse
+from collections.abc import Iterator
+from Graph import Graph, BitGraph
+from cache import packRows, unpackRows
+import isomorphisms
+
+#File layout: MAGIC, then one block per class made of the number of
+#degrees (uint16), the degrees (one byte each), the number of graphs
+#(uint64) and the graphs as fixed size packRows records. Integers are
+#big-endian. Files starting with the gzip magic are read through gzip.
+MAGIC = b"RCGRAPH1"
+GZIP_MAGIC = b"\x1f\x8b"
+
+def recordSize(vertices: int) -> int:
+    return 1 + (vertices*(vertices-1)//2 + 7)//8
+
+class GraphWriter:
+    def __init__(self, path: str, compress: bool = False, bufferSize: int = 1 << 20) -> None:
+        """
+        Writes search results as packed upper triangles, the same bits
+        generator.individual decodes, about one bit per vertex pair
+        instead of a text line per vertex. Writes go through a large
+        buffer and optionally gzip.
+        """
+        raw = gzip.open(path, "wb", compresslevel=6) if compress else open(path, "wb", buffering=0)
+        self.stream = io.BufferedWriter(raw, bufferSize)
+        self.stream.write(MAGIC)
+        self.classes = 0
+        self.graphs = 0
+
+    def writeClass(self, degrees: list[int], graphs: list[Graph]) -> None:
+        graphs = list(graphs)
+        self.stream.write(struct.pack(">H", len(degrees)) + bytes(degrees) + struct.pack(">Q", len(graphs)))
+        self.stream.write(b"".join(packRows(isomorphisms.adjacencyRows(graph)) for graph in graphs))
+        self.classes += 1
+        self.graphs += len(graphs)
+
+    def close(self) -> None:
+        self.stream.close()
+
+def openRead(path: str):
+    with open(path, "rb") as probe:
+        compressed = probe.read(2) == GZIP_MAGIC
+    if compressed:
+        return io.BufferedReader(gzip.open(path, "rb"), 1 << 20)
+    return open(path, "rb", buffering=1 << 20)
+
+def readExact(stream, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated graph file")
+    return data
+
+def readBlocks(stream) -> Iterator[tuple[list[int], int]]:
+    """
+    Yields the (degrees, graph count) header of every class block. The
+    caller reads the block's records before asking for the next one.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a graph file")
+    while True:
+        head = stream.read(2)
+        if not head:
+            return
+        if len(head) != 2:
+            raise ValueError("Truncated graph file")
+        degrees = list(readExact(stream, struct.unpack(">H", head)[0]))
+        yield degrees, struct.unpack(">Q", readExact(stream, 8))[0]
+
+def readRecords(path: str) -> Iterator[tuple[list[int], tuple[int, ...]]]:
+    """
+    Streams (degrees, adjacency rows) for every graph in a file written
+    by GraphWriter, holding one record in memory at a time.
+    """
+    with openRead(path) as stream:
+        for degrees, count in readBlocks(stream):
+            size = recordSize(len(degrees))
+            for _ in range(count):
+                yield degrees, unpackRows(readExact(stream, size))
+
+def readClasses(path: str) -> Iterator[tuple[list[int], list[Graph]]]:
+    """
+    Streams the classes of a file as (degrees, graphs), one class in
+    memory at a time, ready for prog.filt or prog.deckComp. Empty
+    classes come through too.
+    """
+    with openRead(path) as stream:
+        for degrees, count in readBlocks(stream):
+            size = recordSize(len(degrees))
+            yield degrees, [BitGraph.fromRows(unpackRows(readExact(stream, size))).toGraph() for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints a binary result file in prog's text layout.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    for degrees, graphs in readClasses(args.path):
+        print(degrees)
+        print()
+        for graph in graphs:
+            graph.print()
+
+#Unit tests
+def test_roundTrip():
+    import os, tempfile
+    with tempfile.TemporaryDirectory() as folder:
+        classes = [([2, 2, 2, 2, 2], [Graph.cycle(5)]), ([2]*6, [Graph.cycle(6), Graph.cycle(6, 2)]), ([1, 1], [])]
+        for name, compress in [("plain.bin", False), ("packed.bin.gz", True)]:
+            path = os.path.join(folder, name)
+            writer = GraphWriter(path, compress)
+            for degrees, graphs in classes:
+                writer.writeClass(degrees, graphs)
+            writer.close()
+            assert [(degrees, [list(map(sorted, graph.vertices)) for graph in graphs]) for degrees, graphs in readClasses(path)] == \
+                   [(degrees, [list(map(sorted, graph.vertices)) for graph in graphs]) for degrees, graphs in classes]
+            assert [rows for _, rows in readRecords(path)] == [tuple(isomorphisms.adjacencyRows(g)) for _, graphs in classes for g in graphs]
+        assert os.path.getsize(os.path.join(folder, "plain.bin")) == len(MAGIC) + 3*10 + 5 + 6 + 2 + recordSize(5) + 2*recordSize(6)
+        with open(os.path.join(folder, "plain.bin"), "rb") as whole, open(os.path.join(folder, "cut.bin"), "wb") as cut:
+            cut.write(whole.read()[:-1])
+        try:
+            list(readRecords(os.path.join(folder, "cut.bin")))
+            assert False
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import json, time, tracemalloc
+from collections.abc import Iterator
+
+#Module-level switch so the pipeline can call stage/count
+#unconditionally and pay almost nothing when profiling is off
+enabled = False
+timers = {}
+counters = {}
+
+def enable(on: bool = True, memory: bool = False) -> None:
+    """
+    Turns recording on or off. With memory set, allocations are also
+    traced with tracemalloc so peakMemory works. Tracing makes the
+    search several times slower and inflates the timers with it, so
+    it is kept separate.
+    """
+    global enabled
+    enabled = on
+    if on and memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    elif tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def reset() -> None:
+    timers.clear()
+    counters.clear()
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+
+class stage:
+    def __init__(self, name: str) -> None:
+        """
+        Context manager adding the wall and CPU time spent inside it to
+        the timer called name.
+        """
+        self.name = name
+
+    def __enter__(self):
+        if enabled:
+            self.wall = time.perf_counter()
+            self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if enabled:
+            timer = timers.setdefault(self.name, [0.0, 0.0, 0])
+            timer[0] += time.perf_counter() - self.wall
+            timer[1] += time.process_time() - self.cpu
+            timer[2] += 1
+
+def count(name: str, amount: int = 1) -> None:
+    if enabled:
+        counters[name] = counters.get(name, 0) + amount
+
+def timed(iterable, name: str, counter: str = None) -> Iterator:
+    """
+    Wraps a lazy iterable so the time spent producing each item goes to
+    the timer called name and, if counter is given, items are counted.
+    """
+    if not enabled:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        count(counter or name)
+        yield item
+
+def peakMemory() -> int:
+    """
+    Peak memory allocated by Python in this process since the last
+    reset, in kilobytes (0 when memory isn't traced). Unlike the process's
+    resident high-water mark this goes back down on reset, so every
+    class or task gets its own peak.
+    """
+    if not tracemalloc.is_tracing():
+        return 0
+    return tracemalloc.get_traced_memory()[1] // 1024
+
+def snapshot() -> dict:
+    """
+    Everything recorded since the last reset, in a form that can be sent
+    back from a worker process and merged.
+    """
+    snap = {"timers": {name: list(timer) for name, timer in timers.items()},
+            "counters": dict(counters)}
+    if tracemalloc.is_tracing():
+        snap["peakMemoryKB"] = peakMemory()
+    return snap
+
+def merge(snap: dict) -> None:
+    for name, timer in snap["timers"].items():
+        total = timers.setdefault(name, [0.0, 0.0, 0])
+        for i in range(3):
+            total[i] += timer[i]
+    for name, amount in snap["counters"].items():
+        counters[name] = counters.get(name, 0) + amount
+    if "peakMemoryKB" in snap:
+        counters["workerPeakMemoryKB"] = max(counters.get("workerPeakMemoryKB", 0), snap["peakMemoryKB"])
+
+def emit(stream, **fields) -> None:
+    """
+    Writes fields plus the current timers, counters and, when memory is
+    traced, peak memory as one JSON line.
+    """
+    record = dict(fields)
+    record["timers"] = {name: {"wall": round(timer[0], 6), "cpu": round(timer[1], 6), "calls": timer[2]}
+                        for name, timer in timers.items()}
+    record["counters"] = dict(counters)
+    if tracemalloc.is_tracing():
+        record["peakMemoryKB"] = peakMemory()
+    stream.write(json.dumps(record) + "\n")
+    stream.flush()
+
+#Unit tests
+def test_instrument():
+    import io
+    enable()
+    reset()
+    with stage("work"):
+        count("items", 2)
+    assert list(timed(range(3), "produce", "produced")) == [0, 1, 2]
+    assert timers["work"][2] == 1 and timers["produce"][2] == 4
+    worker = snapshot()
+    merge(worker)
+    assert counters["items"] == 4 and counters["produced"] == 6
+    stream = io.StringIO()
+    emit(stream, degrees=[2, 2])
+    assert json.loads(stream.getvalue())["counters"]["items"] == 4
+    assert "peakMemoryKB" not in snapshot() and peakMemory() == 0
+    enable(memory=True)
+    block = bytearray(1 << 20)
+    assert peakMemory() >= 1024
+    del block
+    reset()
+    assert peakMemory() < 1024
+    merge(snapshot())
+    assert "workerPeakMemoryKB" in counters
+    enable(False)
+    reset()
+    count("items")
+    assert counters == {}
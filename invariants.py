@@ -0,0 +1,161 @@
+from Graph import Graph
+import isomorphisms, instrument
+
+def members(mask: int) -> list[int]:
+    vertices = []
+    while mask:
+        low = mask & -mask
+        vertices.append(low.bit_length() - 1)
+        mask ^= low
+    return vertices
+
+#Cheap invariants of a single card, given the parent's rows and a mask
+#of the card's vertices. Each is an isomorphism invariant of the card,
+#so the sorted tuple of its values over the deck is determined by the
+#deck: hypomorphic graphs always agree on it.
+def cardDegrees(rows: list[int], alive: int) -> tuple[int, ...]:
+    """
+    The card's degree sequence, sorted.
+    """
+    return tuple(sorted(bin(rows[u] & alive).count("1") for u in members(alive)))
+
+def cardNeighborDegrees(rows: list[int], alive: int) -> tuple:
+    """
+    For every vertex of the card its degree and its neighbors' degrees,
+    sorted.
+    """
+    degrees = {u: bin(rows[u] & alive).count("1") for u in members(alive)}
+    return tuple(sorted((degrees[u], tuple(sorted(degrees[w] for w in members(rows[u] & alive)))) for u in degrees))
+
+def cardTriangles(rows: list[int], alive: int) -> int:
+    """
+    Triangles in the card: every edge uw adds the common neighbors of u
+    and w, which counts each triangle once per edge.
+    """
+    total = 0
+    for u in members(alive):
+        adjacent = rows[u] & alive
+        for w in members(adjacent >> (u + 1)):
+            total += bin(adjacent & rows[w + u + 1]).count("1")
+    return total // 3
+
+def cardSquares(rows: list[int], alive: int) -> int:
+    """
+    4-cycles in the card: every pair of vertices with c common
+    neighbors closes c choose 2 of them, and each 4-cycle is seen from
+    both of its diagonals. By Kelly's lemma the count in the whole graph
+    follows from the deck as well; the per-card counts are stronger.
+    """
+    total = 0
+    vertices = members(alive)
+    for i in range(len(vertices)):
+        for w in vertices[i+1:]:
+            common = bin(rows[vertices[i]] & rows[w] & alive).count("1")
+            total += common*(common - 1)//2
+    return total // 2
+
+def cardDistances(rows: list[int], alive: int) -> tuple:
+    """
+    For every vertex of the card the sizes of the layers of a
+    breadth-first search from it, sorted.
+    """
+    profiles = []
+    for u in members(alive):
+        seen = frontier = 1 << u
+        layers = []
+        while frontier:
+            reached = 0
+            for w in members(frontier):
+                reached |= rows[w]
+            frontier = reached & alive & ~seen
+            seen |= frontier
+            layers.append(bin(frontier).count("1"))
+        profiles.append(tuple(layers))
+    return tuple(sorted(profiles))
+
+#Screening stages, cheapest first
+STAGES = [cardDegrees, cardNeighborDegrees, cardTriangles, cardSquares, cardDistances]
+
+def deckInvariant(rows: list[int], stage, edges: bool = False) -> tuple:
+    """
+    The sorted values of one stage's card invariant over the deck, or
+    over the edge deck with edges set. Edge cards are made by toggling
+    the edge in a private copy of the rows and toggling it back.
+    """
+    size = len(rows)
+    full = (1 << size) - 1
+    if not edges:
+        return tuple(sorted(stage(rows, full & ~(1 << v)) for v in range(size)))
+    rows = list(rows)
+    values = []
+    for v1 in range(size):
+        for v2 in members(rows[v1] >> (v1 + 1)):
+            v2 += v1 + 1
+            rows[v1] ^= 1 << v2
+            rows[v2] ^= 1 << v1
+            values.append(stage(rows, full))
+            rows[v1] ^= 1 << v2
+            rows[v2] ^= 1 << v1
+    return tuple(sorted(values))
+
+def screen(graphs: list[Graph], edges: bool = False) -> list[int]:
+    """
+    Buckets the graphs by each stage's deck invariant in turn, only
+    splitting buckets that still hold more than one graph. A graph left
+    alone in its bucket can't share a deck with any other graph, so
+    only the indices of the graphs that still share a bucket after the
+    last stage are returned, in order; those are the ones that need
+    full card certificates.
+    """
+    rows = [isomorphisms.adjacencyRows(g) for g in graphs]
+    groups = [list(range(len(graphs)))]
+    for stage in STAGES:
+        refined = []
+        with instrument.stage("screen." + stage.__name__):
+            for group in groups:
+                buckets = {}
+                for i in group:
+                    buckets.setdefault(deckInvariant(rows[i], stage, edges), []).append(i)
+                refined += [bucket for bucket in buckets.values() if len(bucket) > 1]
+        groups = refined
+        if not groups:
+            break
+    suspects = sorted(i for group in groups for i in group)
+    instrument.count("screened", len(graphs) - len(suspects))
+    return suspects
+
+#Unit tests
+#path and star are the two trees on 4 vertices, relabeled is path with
+#its vertices renamed, and matching and shortPath are the smallest edge
+#reconstruction counterexample
+PATH = [(0, 1), (1, 2), (2, 3)]
+STAR = [(0, 1), (0, 2), (0, 3)]
+RELABELED = [(2, 0), (0, 3), (3, 1)]
+MATCHING = [(0, 1), (2, 3)]
+SHORTPATH = [(0, 1), (1, 2)]
+
+def test_cardInvariants():
+    g = Graph.cycle(6)
+    g.addEdge(0, 3)
+    g.addEdge(0, 2)
+    rows = isomorphisms.adjacencyRows(g)
+    full = (1 << 6) - 1
+    assert cardDegrees(rows, full) == (2, 2, 2, 3, 3, 4)
+    assert cardTriangles(rows, full) == 2
+    assert cardSquares(rows, full) == 2
+    assert cardTriangles(rows, full & ~1) == 0 and cardSquares(rows, full & ~1) == 0
+    assert deckInvariant(rows, cardTriangles) == (0, 0, 1, 1, 2, 2)
+    assert len(deckInvariant(rows, cardDegrees, True)) == 8
+    assert cardNeighborDegrees(rows, full & ~1) == ((1, (2,)), (1, (2,)), (2, (1, 2)), (2, (1, 2)), (2, (2, 2)))
+    assert cardDistances(rows, full & ~1) == ((1, 1, 1, 1, 0), (1, 1, 1, 1, 0), (2, 1, 1, 0), (2, 1, 1, 0), (2, 2, 0))
+
+def test_screen():
+    path = Graph.fromEdges(4, PATH)
+    star = Graph.fromEdges(4, STAR)
+    relabeled = Graph.fromEdges(4, RELABELED)
+    assert screen([path, star]) == []
+    assert screen([path, star, relabeled]) == [0, 2]
+    matching = Graph.fromEdges(4, MATCHING)
+    shortPath = Graph.fromEdges(4, SHORTPATH)
+    assert screen([matching, shortPath], edges=True) == [0, 1]
+    assert screen([matching, shortPath]) == []
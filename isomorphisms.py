@@ -1,31 +1,35 @@
-from Graph import Graph, WeightedDigraph
+from Graph import Graph, BitGraph, WeightedDigraph
 from copy import deepcopy
+from collections import deque
+import instrument
+
+#Bumped whenever certificate() changes, so stored certificates from an
+#older algorithm are never mixed with new ones
+CERTIFICATE_VERSION = 2
+
+def adjacencyRows(g: Graph) -> list[int]:
+    """
+    The bitset rows of g, reusing them when g is already a BitGraph.
+    """
+    if isinstance(g, BitGraph):
+        return g.rows
+    return BitGraph.fromGraph(g).rows
 
 def partAdjacencies(g: Graph, part: list[list[int]]) -> list[list[int]]:
     """
     Given a graph and a partition on the vertices returns the
     adjacencies each vertex has with each cell
     """
-    #Basically O(n^2) just uses a particular ordering
-    #to iterate through the vertices twice 
-    cellList = []
-    globIter = -1
-    for cell in range(len(part)):
-        for vert in range(len(part[cell])):
-            globIter += 1
-            #Zeroes out the adjacencies in the partition list
-            cellList.append([0 for i in range(len(part))])
-            for cell2 in range(len(part)):
-                for vert2 in part[cell2]:
-                    #If vert2 is not adjacent to vert1
-                    #skip. Else, add 1 to the list associated
-                    #with vert1 at the index of that cell
-                    try: 
-                        g.vertices[part[cell][vert]].index(vert2)
-                        cellList[globIter][cell2] += 1
-                    except:
-                        pass
-    return cellList
+    #One popcount per (vertex, cell) pair, walking the vertices in
+    #partition order
+    rows = adjacencyRows(g)
+    masks = []
+    for cell in part:
+        mask = 0
+        for vert in cell:
+            mask |= 1 << vert
+        masks.append(mask)
+    return [[bin(rows[vert] & mask).count("1") for mask in masks] for cell in part for vert in cell]
     
 def initPartition(g: Graph) -> list[list[int]]:
     """
@@ -33,17 +37,21 @@ def initPartition(g: Graph) -> list[list[int]]:
     The degree sequence is used because the initial partition 
     must be invariant under automorphism.
     """
-    degSeq = []
-    for i in range(len(g.vertices)):
-        degSeq.append(len(g.vertices[i]))
-    degSeq = sorted(set(degSeq), reverse=True)
+    return degreePartition([len(adjacent) for adjacent in g.vertices])
+
+def degreePartition(degrees: list[int]) -> list[list[int]]:
+    """
+    Groups the vertices into cells by degree, in decreasing order of
+    degree.
+    """
+    degSeq = sorted(set(degrees), reverse=True)
     #Original version was specific to bidegreed graphs. Generalized
     #it with no small amount of pain and distress 
     part = [list() for i in range(len(degSeq))]
-    for i in range(len(g.vertices)):
+    for v in range(len(degrees)):
         #Probably should've just used a dict, but the conversions
         #seemed like kind of a pain 
-        part[degSeq.index(len(g.vertices[i]))].append(i)
+        part[degSeq.index(degrees[v])].append(v)
     return part
 
 def quotient(g: Graph, part: list[list[int]]) -> list[list[int]]:
@@ -53,125 +61,241 @@ def quotient(g: Graph, part: list[list[int]]) -> list[list[int]]:
     result is a partition where every element in every cell bears the
     same relation to every cell.
     """
-    #holds the list of adjacencies between verts and cells
-    cellList = {vertex:[] for vertex in range(len(g.vertices))}
-    #Refines partition so that each member of a cell
-    #is adjacent to the same number of vertices from 
-    #each cell, including itself
-    refined = False
-    while not refined:
-        newPart = []
-        cellList = partAdjacencies(g, part)
-        globIter = 0
-        for cell in range(len(part)):
-            locIter = -1
-            #consistent reordering within cell
-            if len(part[cell]) > 1:
-                #in progress reordering
-                reordering = []
-                #adjacency lists to be sorted
-                revLookup = []
-                for vert in part[cell]:
-                    locIter += 1
-                    revLookup.append(cellList[globIter + locIter])
-                #sorting adjacency lists
-                revLookup = sorted(revLookup)
-                #reordering original cell by using sorted list of adjacency lists
-                for term in revLookup:
-                    locIter = -1
-                    for vert in part[cell]:
-                        locIter += 1
-                        if cellList[globIter + locIter] == term and vert not in reordering:
-                            reordering.append(vert)
-                #removes any duplicates added in the previous step
-                part[cell] = reordering
-                cellList = partAdjacencies(g, part)
-            if len(part[cell]) > 1:
-                #Tracks what vertices have been updated within the cell
-                updated = []
-                locIter = -1
-                for vert in part[cell]:
-                    locIter += 1
-                    if vert not in updated:
-                        #Sets the standard for the list comparison and
-                        #creates a subpartition 
-                        standard = cellList[globIter + locIter]
-                        updated.append(vert)
-                        subcell = [vert]
-                        #Adds any vert in the cell sharing the same list
-                        #to the new subpartition 
-                        locIter2 = -1
-                        for vert2 in part[cell]:
-                            locIter2 += 1
-                            if vert2 not in updated and cellList[globIter + locIter2] == standard:
-                                subcell.append(vert2)
-                                updated.append(vert2)
-                        newPart.append(subcell)
+    return refine(g, part)
+
+def refine(g: Graph, part: list[list[int]], active: list[int] = None) -> list[list[int]]:
+    """
+    Equitable refinement driven by a queue of splitter cells, in the
+    style of Hopcroft and McKay. Cells are runs of one vertex array,
+    named by their start. A splitter only visits the cells of the
+    vertices it counts, and splits each in place by moving the counted
+    vertices to the end of the run: uncounted vertices first, then
+    ascending count. Every new piece is queued but the (first) largest,
+    unless the cell was queued already, so the total work is O(m log n).
+    The order of the cells is invariant under relabelling, and cells
+    come out sorted when part's are. active lists the indices of the
+    cells to start from (all by default); different active lists can
+    order the result differently, so partitions that are compared must
+    be refined the same way.
+    """
+    neighbors = g.vertices
+    size = len(neighbors)
+    #order holds the cells back to back; cellOf maps a vertex to the
+    #start of its cell and end a start to the end of its cell, and a
+    #split cell keeps its start for its first piece
+    order = []
+    position = [0 for _ in range(size)]
+    cellOf = [0 for _ in range(size)]
+    end = [0 for _ in range(size)]
+    starts = []
+    for cell in part:
+        start = len(order)
+        starts.append(start)
+        for vert in cell:
+            position[vert] = len(order)
+            cellOf[vert] = start
+            order.append(vert)
+        end[start] = len(order)
+    if active is None:
+        queue = deque(starts)
+    else:
+        queue = deque(starts[i] for i in active)
+    queued = set(queue)
+    #set once a split reorders the uncounted vertices of a cell
+    shuffled = False
+
+    while queue:
+        splitter = queue.popleft()
+        queued.discard(splitter)
+        counts = {}
+        for vert in order[splitter:end[splitter]]:
+            for adjacent in neighbors[vert]:
+                counts[adjacent] = counts.get(adjacent, 0) + 1
+        touched = {}
+        for vert in counts:
+            start = cellOf[vert]
+            if start in touched:
+                touched[start].append(vert)
             else:
-                newPart.append(part[cell])
-            globIter += len(part[cell])
-        #The length is nondecreasing across iterations, and if it's the
-        #same, kill the loop 
-        if len(newPart) == len(part):
-            refined = True
-        else:
-            part = newPart
+                touched[start] = [vert]
+
+        for start in sorted(touched):
+            stop = end[start]
+            counted = touched[start]
+            uncounted = stop - start - len(counted)
+            if uncounted == 0:
+                first = counts[counted[0]]
+                for vert in counted:
+                    if counts[vert] != first:
+                        break
+                else:
+                    continue
+            counted.sort(key=position.__getitem__)
+            counted.sort(key=counts.__getitem__)
+            #a run at most twice the counted vertices is cheap to rebuild
+            #in order; a longer one only has its counted vertices moved
+            if uncounted <= len(counted):
+                run = [vert for vert in order[start:stop] if vert not in counts]
+                run += counted
+                order[start:stop] = run
+                for i in range(len(run)):
+                    position[run[i]] = start + i
+            else:
+                shuffled = True
+                for i in range(len(counted)):
+                    target = stop - 1 - i
+                    vert = counted[i]
+                    other = order[target]
+                    order[position[vert]], order[target] = other, vert
+                    position[other], position[vert] = position[vert], target
+                for i in range(len(counted)):
+                    order[uncounted + start + i] = counted[i]
+                    position[counted[i]] = uncounted + start + i
+            pieces = [start] if uncounted else []
+            last = None
+            for i in range(len(counted)):
+                count = counts[counted[i]]
+                if count != last:
+                    pieces.append(uncounted + start + i)
+                    last = count
+                cellOf[counted[i]] = pieces[-1]
+            best = -1
+            skip = -1
+            for i in range(len(pieces)):
+                stopAt = pieces[i + 1] if i + 1 < len(pieces) else stop
+                end[pieces[i]] = stopAt
+                if stopAt - pieces[i] > best:
+                    best = stopAt - pieces[i]
+                    skip = i
+            if pieces[0] in queued:
+                skip = -1
+            for i in range(len(pieces)):
+                if i != skip and pieces[i] not in queued:
+                    queue.append(pieces[i])
+                    queued.add(pieces[i])
+
+    part = []
+    start = 0
+    while start < len(order):
+        cell = order[start:end[start]]
+        if shuffled:
+            cell.sort()
+        part.append(cell)
+        start = end[start]
     return part
 
+def search(g: Graph, part: list[list[int]] = None) -> tuple[list[int], tuple[int, ...], list[list[int]]]:
+    """
+    Individualization-refinement search for a canonical labeling of g
+    that respects the ordered partition part (initPartition(g) by
+    default). Returns the canonical labeling (position -> vertex), the
+    canonical form and generators of the automorphism group.
+    """
+    neighbors = g.vertices
+    if part is None:
+        part = initPartition(g)
+    generators = []
+    #first and best leaves as (form, labeling, path)
+    leaves = {}
+
+    def leafForm(labeling: list[int]) -> tuple[int, ...]:
+        position = [0 for _ in range(len(labeling))]
+        for i in range(len(labeling)):
+            position[labeling[i]] = i
+        form = []
+        for vert in labeling:
+            row = 0
+            for adjacent in neighbors[vert]:
+                row |= 1 << position[adjacent]
+            form.append(row)
+        return tuple(form)
+
+    def common(path1: list[int], path2: list[int]) -> int:
+        depth = 0
+        while depth < min(len(path1), len(path2)) and path1[depth] == path2[depth]:
+            depth += 1
+        return depth
+
+    def visit(part: list[list[int]], path: list[int]) -> int:
+        #returns the depth the search should resume at
+        target = 0
+        while target < len(part) and len(part[target]) == 1:
+            target += 1
+        if target == len(part):
+            labeling = [cell[0] for cell in part]
+            form = leafForm(labeling)
+            if not leaves:
+                leaves["first"] = leaves["best"] = (form, labeling, path)
+                return len(path)
+            for leaf in ("first", "best"):
+                if form == leaves[leaf][0]:
+                    automorphism = [0 for _ in range(len(labeling))]
+                    for i in range(len(labeling)):
+                        automorphism[leaves[leaf][1][i]] = labeling[i]
+                    generators.append(automorphism)
+                    return common(path, leaves[leaf][2])
+            if form < leaves["best"][0]:
+                leaves["best"] = (form, labeling, path)
+            return len(path)
+
+        cell = part[target]
+        tried = []
+        for vert in cell:
+            if tried:
+                stabilizer = [gen for gen in generators if all(gen[fixed] == fixed for fixed in path)]
+                parents = orbitRoots(len(neighbors), stabilizer)
+                if find(parents, vert) in {find(parents, other) for other in tried}:
+                    continue
+            tried.append(vert)
+            child = part[:target] + [[vert], [other for other in cell if other != vert]] + part[target+1:]
+            back = visit(refine(g, child, [target]), path + [vert])
+            if back < len(path):
+                return back
+        return len(path)
+
+    visit(refine(g, part), [])
+    form, labeling, path = leaves["best"]
+    return (labeling, form, generators)
+
+def orbitRoots(size: int, generators: list[list[int]]) -> list[int]:
+    """
+    Union-find parents for the orbits of the group spanned by generators.
+    """
+    parents = list(range(size))
+    for gen in generators:
+        for vert in range(size):
+            root1, root2 = find(parents, vert), find(parents, gen[vert])
+            if root1 != root2:
+                parents[max(root1, root2)] = min(root1, root2)
+    return parents
+
+def find(parents: list[int], vert: int) -> int:
+    while parents[vert] != vert:
+        parents[vert] = parents[parents[vert]]
+        vert = parents[vert]
+    return vert
+
+def orbitPartition(labeling: list[int], generators: list[list[int]]) -> list[list[int]]:
+    """
+    Groups the vertices into orbits, ordered (like the vertices inside
+    them) by canonical position, which makes the order invariant.
+    """
+    parents = orbitRoots(len(labeling), generators)
+    orbits = {}
+    for vert in labeling:
+        orbits.setdefault(find(parents, vert), []).append(vert)
+    return list(orbits.values())
+
 def terminal(g: Graph, part: list[list[int]]) -> list[list[int]]:
     """
     Further refine the partition to maximize the number of transitive
     subgraphs. If two graphs are isomorphic, they have the same 
-    terminal graph. Conjecturely, this is the automorphism partition
-    on g.
-    """
-    #Alg only terminates when it can get through all cells w/out
-    #repartitioning 
-    terminate = False
-    while not terminate:
-        #Check all cells
-        for i in range(len(part)):
-            if len(part[i]) != 1:
-                #Only cells with more than 1 vertex are considered
-                unique = []
-                quotDict = {}
-                #Iterate through all vertices of i, creating a new
-                #cell containing only the jth cell and making a new
-                #quotient based on this new partition. Since this is
-                #invariant under automorphism, vertices with different
-                #quotients can't be in the same transitive subgraph 
-                for j in range(len(part[i])):
-                    partTest = deepcopy(part)
-                    partTest[i].pop(j)
-                    partTest.insert(i, [part[i][j]])
-                    jthQuotient = partAdjacencies(g,quotient(g, partTest))
-                    unique.append(jthQuotient)
-                    quotDict[j] = jthQuotient
-                uniqueSet = []
-                for k in range(len(unique)):
-                    if unique[k] not in uniqueSet:
-                        uniqueSet.append(unique[k])
-                if len(uniqueSet) == 1 and i == len(part)-1:
-                    terminate = True
-                #If any aquotients are different, repartition
-                elif len(uniqueSet) != 1:
-                    unique = sorted(uniqueSet)
-                    subcells = [list() for i in range(len(unique))]
-                    for t in range(len(unique)):
-                        for vert in range(len(part[i])):
-                            if quotDict[vert] == unique[t]:
-                                subcells[t].append(part[i][vert])
-                    part.pop(i)
-                    for cell in subcells[::-1]:
-                        part.insert(i, cell)
-                    #starts over with new partition
-                    break
-            elif len(part[i]) == 1 and i == len(part)-1:
-                terminate = True
-    #cellList = partAdjacencies(g, part)
-    #extract and sort the partition adjacencies so that the finalized
-    #list is the same across isomorphisms.
-    return part
+    terminal graph. The cells are the orbits of the automorphisms of g
+    that respect part, as found by search, so this is exactly the
+    automorphism partition.
+    """
+    labeling, form, generators = search(g, part)
+    return orbitPartition(labeling, generators)
 
 def final(g: Graph, part: list[list[int]]) -> tuple[list[list[int]], dict[int:list[list[int]]]]:
     """
@@ -192,4 +316,172 @@ def final(g: Graph, part: list[list[int]]) -> tuple[list[list[int]], dict[int:li
     return (partAdjacencies(g, part), vertQuotients)
 
 def representative(g1: Graph) -> tuple[list[list[int]], dict[int:list[list[int]]]]:
-    return final(g1, terminal(g1, quotient(g1, initPartition(g1))))
\ No newline at end of file
+    return final(g1, terminal(g1, quotient(g1, initPartition(g1))))
+
+def certificate(g: Graph, part: list[list[int]] = None) -> tuple:
+    """
+    A hashable, compact certificate of g: its canonical form from
+    search, one adjacency row per canonical position. Two graphs get
+    equal certificates exactly when they are isomorphic, so a class can
+    be deduplicated with one set or dict insert per graph.
+    """
+    labeling, form, generators = search(g, part)
+    return form
+
+def cardPartition(degrees: list[int], row: int, delete: int) -> list[list[int]]:
+    """
+    initPartition of the card with vertex delete removed, worked out
+    from the parent's degrees and the deleted vertex's adjacency row
+    instead of rescanning the card.
+    """
+    return degreePartition([degrees[v] - ((row >> v) & 1) for v in range(len(degrees)) if v != delete])
+
+def cardCertificates(g: Graph, part: list[list[int]] = None, cache = None) -> list[tuple]:
+    """
+    Returns the certificates of all the cards of g, indexed by deleted
+    vertex. part is g's orbit partition (found by search if not given);
+    one card per cell is certified. A cache.CertificateCache may be
+    passed to look the cards up in bulk.
+    """
+    bits = g if isinstance(g, BitGraph) else BitGraph.fromGraph(g)
+    if part is None:
+        labeling, form, generators = search(g)
+        part = orbitPartition(labeling, generators)
+    degrees = [bits.degree(v) for v in range(bits.size)]
+    instrument.count("cards", len(part))
+    cards = [bits.card(cell[0]) for cell in part]
+    cardParts = [cardPartition(degrees, bits.rows[cell[0]], cell[0]) for cell in part]
+    if cache is None:
+        cellCerts = [certificate(cards[i], cardParts[i]) for i in range(len(part))]
+    else:
+        cellCerts = cache.certificates(cards, cardParts)
+    certs = [None for _ in range(bits.size)]
+    for i in range(len(part)):
+        for vertex in part[i]:
+            certs[vertex] = cellCerts[i]
+    return certs
+
+def edgeOrbits(edges: list[tuple[int, int]], generators: list[list[int]]) -> list[list[int]]:
+    """
+    Groups the indices of edges into orbits of the group spanned by
+    generators, each orbit in ascending order.
+    """
+    index = {edge: i for i, edge in enumerate(edges)}
+    edgeGenerators = [[index[(min(gen[v1], gen[v2]), max(gen[v1], gen[v2]))] for v1, v2 in edges] for gen in generators]
+    parents = orbitRoots(len(edges), edgeGenerators)
+    orbits = {}
+    for i in range(len(edges)):
+        orbits.setdefault(find(parents, i), []).append(i)
+    return list(orbits.values())
+
+def edgeCardPartition(degrees: list[int], vertex1: int, vertex2: int) -> list[list[int]]:
+    """
+    initPartition of the card with edge (vertex1, vertex2) removed,
+    worked out from the parent's degrees.
+    """
+    cardDegrees = list(degrees)
+    cardDegrees[vertex1] -= 1
+    cardDegrees[vertex2] -= 1
+    return degreePartition(cardDegrees)
+
+def edgeCardCertificates(g: Graph, cache = None, generators: list[list[int]] = None) -> list[tuple]:
+    """
+    Returns the certificates of all the edge-deleted cards of g,
+    indexed like BitGraph.edges. Cards are never copied: each one is
+    made by toggling its edge off a single working copy of g,
+    certified, and toggled back. Edges in the same orbit of the
+    automorphism group found by search give isomorphic cards, so one
+    card per edge orbit is certified. generators may be passed when an
+    earlier search of g already found them. A cache.CertificateCache
+    may be passed to look the cards up in bulk.
+    """
+    bits = BitGraph.fromRows(adjacencyRows(g))
+    if generators is None:
+        labeling, form, generators = search(bits)
+    edges = bits.edges()
+    orbits = edgeOrbits(edges, generators)
+    degrees = [bits.degree(v) for v in range(bits.size)]
+    reps = [edges[orbit[0]] for orbit in orbits]
+    instrument.count("edgeCards", len(orbits))
+
+    def cardCertificate(i: int) -> tuple:
+        bits.toggleEdge(*reps[i])
+        cert = certificate(bits, edgeCardPartition(degrees, *reps[i]))
+        bits.toggleEdge(*reps[i])
+        return cert
+
+    if cache is None:
+        orbitCerts = [cardCertificate(i) for i in range(len(reps))]
+    else:
+        keys = []
+        for edge in reps:
+            bits.toggleEdge(*edge)
+            keys.append(cache.key(bits.rows))
+            bits.toggleEdge(*edge)
+        orbitCerts = cache.lookup(keys, cardCertificate)
+    certs = [None for _ in edges]
+    for i in range(len(orbits)):
+        for edge in orbits[i]:
+            certs[edge] = orbitCerts[i]
+    return certs
+
+#Unit tests
+PATH = [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+def test_certificate():
+    triangles = Graph(6)
+    for v1, v2 in [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)]:
+        triangles.addEdge(v1, v2)
+    relabeled = Graph(6)
+    for v1, v2 in [(0, 2), (2, 4), (4, 1), (1, 3), (3, 5), (5, 0)]:
+        relabeled.addEdge(v1, v2)
+    assert hash(certificate(Graph.cycle(6))) == hash(certificate(relabeled))
+    assert certificate(Graph.cycle(6)) == certificate(relabeled)
+    assert certificate(Graph.cycle(6)) != certificate(triangles)
+    assert certificate(Graph.cycle(5)) == certificate(Graph.cycle(5, 2))
+
+def test_cardCertificates():
+    g = Graph.cycle(6)
+    g.addEdge(0, 3)
+    g.addEdge(1, 4)
+    assert cardCertificates(g) == [certificate(card) for card in g.deck()]
+    assert cardPartition([2, 3, 3, 2], 0b1010, 0) == [[1], [0], [2]]
+
+def test_edgeCardCertificates():
+    g = Graph.cycle(6)
+    g.addEdge(0, 3)
+    bits = BitGraph.fromGraph(g)
+    assert edgeCardCertificates(g) == [certificate(card) for card in bits.edgeDeck()]
+    assert edgeCardCertificates(bits) == edgeCardCertificates(g)
+    assert edgeCardCertificates(g, generators=search(g)[2]) == edgeCardCertificates(g)
+    labeling, form, generators = search(g)
+    assert sorted(map(len, edgeOrbits(bits.edges(), generators))) == [1, 2, 4]
+    assert edgeCardPartition([2, 3, 3, 2], 1, 2) == [[0, 1, 2, 3]]
+
+def test_refine():
+    path = Graph.fromEdges(5, PATH)
+    #degree 2 cell splits into the neighbors of the ends and the centre
+    assert refine(path, initPartition(path)) == [[1, 3], [2], [0, 4]]
+    assert refine(path, [[0], [1, 2, 3, 4]], [0]) == [[0], [4], [3], [2], [1]]
+    assert quotient(path, [[0], [1, 2, 3, 4]]) == [[0], [4], [2], [3], [1]]
+    assert refine(Graph.cycle(6), [[0, 1, 2, 3, 4, 5]]) == [[0, 1, 2, 3, 4, 5]]
+    longPath = Graph(101)
+    for v in range(100):
+        longPath.addEdge(v, v + 1)
+    assert sorted(refine(longPath, initPartition(longPath))) == [[v, 100 - v] for v in range(50)] + [[50]]
+
+def test_search():
+    prism = Graph.cycle(6)
+    for v1, v2 in [(0, 3), (1, 4), (2, 5)]:
+        prism.addEdge(v1, v2)
+    labeling, form, generators = search(prism)
+    assert sorted(labeling) == list(range(6))
+    assert len(terminal(prism, initPartition(prism))) == 1
+    shuffled = Graph(6)
+    order = [3, 0, 5, 1, 4, 2]
+    for v1 in range(6):
+        for v2 in prism.vertices[v1]:
+            shuffled.addEdge(order[v1], order[v2])
+    assert certificate(shuffled) == form
+    path = Graph.fromEdges(5, PATH)
+    assert sorted(map(sorted, terminal(path, initPartition(path)))) == [[0, 4], [1, 3], [2]]
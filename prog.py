@@ -1,110 +1,474 @@
-import Graph, isomorphisms, generator, sys
-from copy import deepcopy
+import Graph, isomorphisms, generator, cache, instrument, sequences, graphfile, invariants, sys, os, gzip, argparse
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Iterator
 
 def traverse(g: Graph.Graph) -> bool:
     """
     Returns True if the graph is connected and False otherwise
     """
-    #Mutually exclusive lists that total V(g)
-    grabbed = [0]
-    unused = [i for i in range(1, len(g.vertices))]
-    #When all vertices are grabbed, stop and return True
-    while len(unused) > 0:
-        available = []
-        for vertex in grabbed:
-            for edge in g.vertices[vertex]:
-                if edge not in grabbed:
-                    available.append(edge)
-        available = list(set(available))
-        if len(available) == 0:
-            return False
-        grabbed.append(available[0])
-        unused.remove(available[0])
-    return True
-
-def filt(biClass: list[Graph.Graph]) -> list[Graph.Graph]:
+    return generator.isConnected(isomorphisms.adjacencyRows(g))
+
+def certificates(graphs: list[Graph.Graph], certCache: cache.CertificateCache = None, groups: list = None) -> list[tuple]:
+    """
+    Certificates of a batch of graphs, looked up in bulk when a cache is
+    given. If groups is given, the (labeling, generators) found by each
+    graph's search are appended to it so the deck stage can reuse them,
+    or None for graphs whose certificate came from the cache.
+    """
+    instrument.count("certificates", len(graphs))
+    with instrument.stage("representative"):
+        if certCache is None:
+            searched = [isomorphisms.search(graph) for graph in graphs]
+            if groups is not None:
+                groups.extend((labeling, generators) for labeling, form, generators in searched)
+            return [form for labeling, form, generators in searched]
+        if groups is not None:
+            groups.extend(None for _ in graphs)
+        return certCache.certificates(graphs)
+
+def filt(biClass: list[Graph.Graph], certCache: cache.CertificateCache = None, groups: list = None, checked: bool = False) -> list[Graph.Graph]:
+    """
+    Drops disconnected graphs and keeps the first graph of every
+    isomorphism class, using hashable certificates so each graph costs
+    one dict insert instead of a comparison against every other graph.
+    biClass may be any iterable; only the unique graphs are kept. With a
+    cache, connected graphs are certified in batches. If groups is
+    given, the automorphism group search found for every kept graph is
+    appended to it in the same order (see certificates), for deckComp.
+    checked means biClass is already known to be connected, as the
+    output of iterClass(connected=True) is, so it isn't checked again.
+    """
+    connected = 0
     classReprs = {}
-    nbiClass = []
-    for graph in biClass:
-        if traverse(graph):
-            nbiClass.append(graph)
-            classReprs[graph] = isomorphisms.representative(graph)
-    biClass = nbiClass
-    rem = []
-    print(len(biClass))
-    for graph1 in range(len(biClass)-1):
-        if graph1 in rem:
-            continue
-        for graph2 in range(graph1 + 1,len(biClass)):
-            if classReprs[biClass[graph1]] == classReprs[biClass[graph2]]:
-                rem.append(graph2)
+    batch = []
+
+    def certify(batch: list[Graph.Graph]) -> None:
+        found = []
+        for cert, kept, group in zip(certificates(batch, certCache, found), batch, found):
+            if cert in classReprs:
+                instrument.count("certificateCollisions")
             else:
-                pass
-    #print(rem)
-    nbiClass = []
-    for graph in range(len(biClass)):
-        if graph not in rem:
-            nbiClass.append(biClass[graph])
-    #print(classReprs)
+                classReprs[cert] = (kept, group)
+
+    for graph in biClass:
+        if not checked:
+            with instrument.stage("traverse"):
+                isConnected = traverse(graph)
+            if not isConnected:
+                continue
+        connected += 1
+        batch.append(graph)
+        if len(batch) == 1024:
+            certify(batch)
+            batch = []
+    certify(batch)
+    instrument.count("connected", connected)
+    instrument.count("unique", len(classReprs))
+    print(connected)
+    nbiClass = [kept for kept, group in classReprs.values()]
+    if groups is not None:
+        groups.extend(group for kept, group in classReprs.values())
     print(len(nbiClass))
     return nbiClass
 
-def deckComp(biClass: list[Graph.Graph]) -> list[Graph.Graph]:
-    classDecks = {}
-    for graph in biClass:
-        classDecks[graph] = [isomorphisms.representative(card) for card in graph.deck()]
-    for i in range(len(biClass)):
-        for j in range(i+1, len(biClass)):
-            a = deepcopy(classDecks[biClass[i]])
-            b = deepcopy(classDecks[biClass[j]])
-            hylo = True
-            for graph1 in range(len(a)):
-                for graph2 in range(len(b)):
-                    if a[graph1] == b[graph2]:
-                        b.pop(graph2)
-                        break
-                    if graph2 == len(b) - 1:
-                        hylo = False
-                if not hylo:
-                    break
-            if hylo:
-                raise ValueError(f"Counterexample found:\n{biClass[i].vertices}\n {isomorphisms.terminal(biClass[i],isomorphisms.quotient(biClass[i],isomorphisms.initPartition(biClass[i])))},\n {biClass[j].vertices}\n {isomorphisms.terminal(biClass[i],isomorphisms.quotient(biClass[j],isomorphisms.initPartition(biClass[j])))} \n {[len(v) for v in biClass[i].vertices]}")
-    return biClass
+def deckKey(graph: Graph.Graph, certCache: cache.CertificateCache = None, group: tuple = None) -> tuple:
+    """
+    Reduces the deck of a graph to a canonical multiset key: the sorted
+    tuple of its card certificates. Two graphs are hypomorphic exactly
+    when their keys are equal. group is the (labeling, generators) of
+    an earlier search of the graph, whose orbits are reused instead of
+    searching again.
+    """
+    with instrument.stage("deck"):
+        part = None if group is None else isomorphisms.orbitPartition(*group)
+        return tuple(sorted(isomorphisms.cardCertificates(graph, part, certCache)))
 
-def main():
-    vertices = int(sys.argv[1])
-    sys.stdout = open(sys.argv[2], "w")
+def counterexample(graph1: Graph.Graph, graph2: Graph.Graph) -> ValueError:
+    """
+    Builds the error reported when two graphs share a deck.
+    """
+    return ValueError(f"Counterexample found:\n{graph1.vertices}\n {isomorphisms.terminal(graph1,isomorphisms.quotient(graph1,isomorphisms.initPartition(graph1)))},\n {graph2.vertices}\n {isomorphisms.terminal(graph2,isomorphisms.quotient(graph2,isomorphisms.initPartition(graph2)))} \n {[len(v) for v in graph1.vertices]}")
 
-    possibilities = generator.genSpecs(vertices)
+def edgeDeckKey(graph: Graph.Graph, certCache: cache.CertificateCache = None, group: tuple = None) -> tuple:
+    """
+    deckKey for the edge deck: the sorted tuple of the certificates of
+    the edge-deleted cards.
+    """
+    with instrument.stage("edgeDeck"):
+        generators = None if group is None else group[1]
+        return tuple(sorted(isomorphisms.edgeCardCertificates(graph, certCache, generators)))
+
+def deckComp(biClass: list[Graph.Graph], certCache: cache.CertificateCache = None, edges: bool = False, groups: list = None) -> list[Graph.Graph]:
+    """
+    Raises a ValueError if two graphs of the class share a deck (their
+    edge decks with edges set). Decks are bucketed by their multiset
+    keys, so a hypomorphic pair shows up as a dict collision rather
+    than through pairwise matching. Keys are only computed for the
+    graphs invariants.screen can't tell apart from every other graph
+    by cheap deck invariants. groups optionally holds each graph's
+    automorphism group as filt collects it.
+    """
+    keyOf = edgeDeckKey if edges else deckKey
+    classDecks = {}
+    biClass = list(biClass)
+    for i in invariants.screen(biClass, edges):
+        graph = biClass[i]
+        key = keyOf(graph, certCache, None if groups is None else groups[i])
+        instrument.count("deckComparisons")
+        if key in classDecks:
+            raise counterexample(classDecks[key], graph)
+        classDecks[key] = graph
+    return biClass
 
+def biClasses(vertices: int) -> list[tuple[int, int, int]]:
+    """
+    Lists the (numDeg1, deg1, deg2) bidegreed classes searched by main,
+    in output order.
+    """
+    classes = []
     for deg1 in range(2, vertices):
         if not deg1 % 2:
-
             if not vertices % 2:
                 start = 2
             else:
                 start = 1
+        else:
+            start = 2
+        for numDeg1 in range(start, vertices, 2):
+            classes.append((numDeg1, deg1, deg1 - 1))
+    return classes
 
-            for numDeg1 in range(start, vertices, 2):
-                biClass = generator.genBiClass(vertices, numDeg1, deg1, deg1 - 1, possibilities)
-                biClass = filt(biClass)
-                biClass = deckComp(biClass)
-                print([deg1]*numDeg1 + [deg1-1]*(vertices-numDeg1))
-                print()
-                for graph in biClass:
-                    graph.print()
+def degreeClasses(vertices: int, family: str = "bi") -> list[list[int]]:
+    """
+    The degree sequences of a search family: "bi" for main's bidegreed
+    classes, "tri" for sequences.triSequences and "all" for every
+    graphical sequence without isolated vertices.
+    """
+    if family == "tri":
+        return sequences.triSequences(vertices)
+    if family == "all":
+        return sequences.allSequences(vertices)
+    return [[deg1]*numDeg1 + [deg2]*(vertices-numDeg1) for numDeg1, deg1, deg2 in biClasses(vertices)]
 
-        else:
-            for numDeg1 in range(2, vertices, 2):
-                biClass = generator.genBiClass(vertices, numDeg1, deg1, deg1 - 1, possibilities)
-                biClass = filt(biClass)
-                biClass = deckComp(biClass)
-                print([deg1]*numDeg1 + [deg1-1]*(vertices-numDeg1))
-                print()
-                for graph in biClass:
-                    graph.print()
+def printClass(degrees: list[int], biClass: list[Graph.Graph], writer: graphfile.GraphWriter = None) -> None:
+    """
+    Writes a finished class as text adjacency lists, or to writer in
+    the binary format when one is given.
+    """
+    if writer is not None:
+        writer.writeClass(degrees, biClass)
+        return
+    print(degrees)
+    print()
+    for graph in biClass:
+        graph.print()
+
+#Set in every worker process by initWorker so tasks don't have to ship
+#the bitcount buckets or reopen the cache
+workerPossibilities = None
+workerCache = None
+
+def initWorker(vertices: int, cachePath: str = None, stats: bool = False, traceMemory: bool = False) -> None:
+    global workerPossibilities, workerCache
+    instrument.enable(stats, traceMemory)
+    workerPossibilities = generator.genSpecs(vertices)
+    if cachePath is not None:
+        workerCache = cache.CertificateCache(cachePath)
+
+def branchClass(vertices: int, num: int, modDegrees: list[int], vectorized: bool = False) -> tuple[int, dict, dict]:
+    """
+    Worker task: searches one first-row branch of a class, see
+    certifyBranch.
+    """
+    instrument.reset()
+    branch = generator.iterValid(vertices - 1, modDegrees, workerPossibilities, (num,), vectorized=vectorized, connected=True)
+    return certifyBranch(vertices, branch, vectorized)
+
+def canonicalBranch(vertices: int, state: tuple) -> tuple[int, dict, dict]:
+    """
+    Worker task: searches the completions of one
+    generator.canonicalStates state of a class, see certifyBranch.
+    """
+    instrument.reset()
+    return certifyBranch(vertices, generator.iterCanonical(*state, connected=True))
+
+def certifyBranch(vertices: int, branch: Iterator[tuple[int, ...]], vectorized: bool = False) -> tuple[int, dict, dict]:
+    """
+    Certifies the connected descriptions of a branch in batches as they
+    are generated, like filt, and returns their number, the first
+    description seen for every certificate (with the automorphism group
+    found by its search) and the task's instrument snapshot.
+    """
+    connected = 0
+    reps = {}
+    descriptions = []
+    graphs = []
+
+    def certify(descriptions: list[tuple[int, ...]], graphs: list[Graph.Graph]) -> None:
+        found = []
+        for cert, description, group in zip(certificates(graphs, workerCache, found), descriptions, found):
+            if cert in reps:
+                instrument.count("certificateCollisions")
+            else:
+                reps[cert] = (description, group)
+
+    for description, graph in generator.iterGraphs(vertices, instrument.timed(branch, "genBiClass", "generated"), vectorized):
+        connected += 1
+        descriptions.append(description)
+        graphs.append(graph)
+        if len(graphs) == 1024:
+            certify(descriptions, graphs)
+            descriptions = []
+            graphs = []
+    certify(descriptions, graphs)
+    if workerCache is not None:
+        workerCache.flush()
+    instrument.count("connected", connected)
+    return connected, reps, instrument.snapshot()
+
+def deckKeys(vertices: int, descriptions: list[tuple[int, ...]], edges: bool = False, groups: list = None) -> tuple[list[tuple], dict]:
+    """
+    Worker task: computes the deck keys (edge deck keys with edges set)
+    of a chunk of graphs, returned with the task's instrument snapshot.
+    groups holds the automorphism groups branchClass found, if any.
+    """
+    instrument.reset()
+    keyOf = edgeDeckKey if edges else deckKey
+    if groups is None:
+        groups = [None for _ in descriptions]
+    keys = [keyOf(generator.individual(vertices, description), workerCache, group) for description, group in zip(descriptions, groups)]
+    if workerCache is not None:
+        workerCache.flush()
+    return keys, instrument.snapshot()
+
+def parallelMain(vertices: int, classes: list[list[int]], jobs: int, breakSymmetry: bool = False, cachePath: str = None, vectorized: bool = False, statsStream = None, writer: graphfile.GraphWriter = None, edges: bool = False, traceMemory: bool = False) -> None:
+    """
+    Runs the search on a process pool of jobs workers and prints the
+    same output as the serial run. Takes main's options: statsStream
+    gets one merged instrument record per class, with the workers'
+    peak memory when traceMemory is set.
+    """
+    possibilities = generator.genSpecs(vertices)
+    lookahead = max(2, jobs)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initWorker, initargs=(vertices, cachePath, statsStream is not None, traceMemory)) as pool:
+        branches = {}
+        for current, degrees in enumerate(classes):
+            window = [i for i in range(current, min(current + lookahead, len(classes))) if i not in branches]
+            for i in sorted(window, key=lambda i: -sequences.estimateCost(classes[i])):
+                if breakSymmetry:
+                    branches[i] = [pool.submit(canonicalBranch, vertices, state)
+                                   for state in generator.canonicalStates(vertices, classes[i], 4 * jobs, True)]
+                else:
+                    branches[i] = [pool.submit(branchClass, vertices, num, modDegrees, vectorized)
+                                   for num, modDegrees in generator.firstRows(vertices, classes[i], possibilities)]
+            futures = branches.pop(current)
+            instrument.reset()
+            connected = 0
+            classReprs = {}
+            for future in futures:
+                count, reps, snap = future.result()
+                instrument.merge(snap)
+                connected += count
+                for cert, rep in reps.items():
+                    if cert in classReprs:
+                        instrument.count("certificateCollisions")
+                    else:
+                        classReprs[cert] = rep
+            descriptions = [description for description, group in classReprs.values()]
+            groups = [group for description, group in classReprs.values()]
+            instrument.count("unique", len(descriptions))
+            print(connected)
+            print(len(descriptions))
+
+            biClass = [graph for description, graph in generator.iterGraphs(vertices, descriptions, vectorized)]
+            suspects = invariants.screen(biClass, edges)
+            chunk = max(1, -(-len(suspects) // (4 * jobs)))
+            keyFutures = [pool.submit(deckKeys, vertices, [descriptions[i] for i in suspects[start:start+chunk]], edges,
+                                      [groups[i] for i in suspects[start:start+chunk]])
+                          for start in range(0, len(suspects), chunk)]
+            classDecks = {}
+            index = 0
+            for future in keyFutures:
+                keys, snap = future.result()
+                instrument.merge(snap)
+                for key in keys:
+                    instrument.count("deckComparisons")
+                    if key in classDecks:
+                        pool.shutdown(cancel_futures=True)
+                        raise counterexample(biClass[classDecks[key]], biClass[suspects[index]])
+                    classDecks[key] = suspects[index]
+                    index += 1
+            printClass(degrees, biClass, writer)
+            if statsStream is not None:
+                instrument.emit(statsStream, vertices=vertices, degrees=degrees, jobs=jobs)
+
+def main():
+    parser = argparse.ArgumentParser(description="Searches graphs of given degree sequences (bidegreed by default) for counterexamples to the reconstruction conjecture.")
+    parser.add_argument("vertices", type=int)
+    parser.add_argument("output")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes (0 uses every core)")
+    parser.add_argument("--break-symmetry", "--orderly", action="store_true",
+                        help="generate one graph per isomorphism class (canonical augmentation)")
+    parser.add_argument("--cache", metavar="PATH",
+                        help="sqlite file caching certificates across runs")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="decode graphs in batches and filter large row buckets with NumPy")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="write per-class timings and counters as JSON lines to PATH ('-' for stderr)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="with --stats, also record each class's peak Python memory (several times slower)")
+    parser.add_argument("--family", choices=["bi", "tri", "all"], default="bi",
+                        help="degree sequences to search: bidegreed, consecutive tridegreed or every graphical one")
+    parser.add_argument("--sequence", metavar="DEGREES",
+                        help="search only this degree sequence, e.g. 3,3,2,2 or 3^6,2^2")
+    parser.add_argument("--by-cost", action="store_true",
+                        help="search the classes in decreasing order of estimated size")
+    parser.add_argument("--shard", metavar="I/K",
+                        help="search only shard I (from 0) of K cost-balanced shards")
+    parser.add_argument("--format", choices=["text", "binary"], default="text",
+                        help="binary writes packed graphs readable with graphfile.readClasses, leaving the counts on stdout")
+    parser.add_argument("--compress", action="store_true", help="gzip the output")
+    parser.add_argument("--edges", action="store_true",
+                        help="compare edge decks instead, looking for edge reconstruction counterexamples")
+    parser.add_argument("--count-only", action="store_true",
+                        help="write each class's number of labeled graphs instead of searching it")
+    args = parser.parse_args()
+    vertices = args.vertices
+    if args.sequence is not None:
+        try:
+            degrees = sorted(sequences.parseSequence(args.sequence), reverse=True)
+        except ValueError:
+            parser.error(f"can't read degree sequence {args.sequence}")
+        if len(degrees) != vertices or not sequences.isGraphical(degrees):
+            parser.error(f"{args.sequence} is not a graphical sequence on {vertices} vertices")
+        classes = [degrees]
+    else:
+        classes = degreeClasses(vertices, args.family)
+    if args.shard is not None:
+        try:
+            index, shards = map(int, args.shard.split("/"))
+        except ValueError:
+            parser.error(f"shard {args.shard} isn't of the form I/K")
+        if not 0 <= index < shards:
+            parser.error(f"shard {args.shard} is out of range")
+        classes = sequences.schedule(classes, shards)[index]
+    elif args.by_cost:
+        classes = sequences.schedule(classes)[0]
+    jobs = args.jobs or os.cpu_count()
+    writer = None
+    if args.format == "binary" and not args.count_only:
+        writer = graphfile.GraphWriter(args.output, args.compress)
+    elif args.compress:
+        sys.stdout = gzip.open(args.output, "wt")
+    else:
+        sys.stdout = open(args.output, "w", buffering=1 << 20)
+    statsStream = None
+    if args.stats == "-":
+        statsStream = sys.stderr
+    elif args.stats is not None:
+        statsStream = open(args.stats, "w")
+    instrument.enable(statsStream is not None, args.trace_memory)
+
+    if args.count_only:
+        for degrees in classes:
+            print(degrees, generator.countValid(vertices, degrees))
+    elif jobs > 1:
+        parallelMain(vertices, classes, jobs, args.break_symmetry, args.cache, args.vectorized, statsStream, writer, args.edges, args.trace_memory)
+    else:
+        possibilities = generator.genSpecs(vertices)
+        certCache = None if args.cache is None else cache.CertificateCache(args.cache)
+        for degrees in classes:
+            instrument.reset()
+            with instrument.stage("class"):
+                biClass = generator.iterClass(vertices, degrees, possibilities, args.break_symmetry, args.vectorized, True)
+                groups = []
+                biClass = filt(instrument.timed(biClass, "genBiClass", "generated"), certCache, groups, checked=True)
+                biClass = deckComp(biClass, certCache, args.edges, groups)
+                if certCache is not None:
+                    certCache.flush()
+            printClass(degrees, biClass, writer)
+            if statsStream is not None:
+                instrument.emit(statsStream, vertices=vertices, degrees=degrees, jobs=1)
+        if certCache is not None:
+            certCache.close()
     
-    sys.stdout.close()
+    if writer is not None:
+        writer.close()
+    else:
+        sys.stdout.close()
+    if statsStream is not None and statsStream is not sys.stderr:
+        statsStream.close()
+
+#Unit tests
+#path and star are the two trees on 4 vertices, relabeled is path with
+#its vertices renamed, and matching and shortPath are the smallest edge
+#reconstruction counterexample
+PATH = [(0, 1), (1, 2), (2, 3)]
+STAR = [(0, 1), (0, 2), (0, 3)]
+RELABELED = [(2, 0), (0, 3), (3, 1)]
+MATCHING = [(0, 1), (2, 3)]
+SHORTPATH = [(0, 1), (1, 2)]
+
+def test_deckComp():
+    path = Graph.Graph.fromEdges(4, PATH)
+    star = Graph.Graph.fromEdges(4, STAR)
+    relabeled = Graph.Graph.fromEdges(4, RELABELED)
+    assert deckKey(path) == deckKey(relabeled)
+    labeling, form, generators = isomorphisms.search(path)
+    assert deckKey(path, group=(labeling, generators)) == deckKey(path)
+    assert edgeDeckKey(path, group=(labeling, generators)) == edgeDeckKey(path)
+    assert deckComp([path, star]) == [path, star]
+    try:
+        deckComp([path, relabeled])
+        assert False
+    except ValueError:
+        pass
+    #both edge decks are two copies of one edge plus two isolated vertices
+    matching = Graph.Graph.fromEdges(4, MATCHING)
+    shortPath = Graph.Graph.fromEdges(4, SHORTPATH)
+    assert deckComp([path, star], edges=True) == [path, star]
+    try:
+        deckComp([matching, shortPath], edges=True)
+        assert False
+    except ValueError:
+        pass
+
+def test_binaryOutput():
+    import io, tempfile
+    from contextlib import redirect_stdout
+    possibilities = generator.genSpecs(6)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "classes.bin")
+        writer = graphfile.GraphWriter(path)
+        with redirect_stdout(io.StringIO()):
+            for degrees in degreeClasses(6)[:3]:
+                printClass(degrees, deckComp(filt(generator.iterClass(6, degrees, possibilities))), writer)
+        writer.close()
+        with redirect_stdout(io.StringIO()):
+            reread = [(degrees, deckComp(filt(graphs))) for degrees, graphs in graphfile.readClasses(path)]
+    assert [degrees for degrees, _ in reread] == degreeClasses(6)[:3]
+    assert [len(graphs) for _, graphs in reread] == [0, 1, 4]
+
+def test_parallelMain():
+    import io
+    from contextlib import redirect_stdout
+    possibilities = generator.genSpecs(6)
+    for breakSymmetry in [False, True]:
+        serial = io.StringIO()
+        with redirect_stdout(serial):
+            for degrees in degreeClasses(6):
+                printClass(degrees, deckComp(filt(generator.iterClass(6, degrees, possibilities, breakSymmetry=breakSymmetry, connected=True), checked=True)))
+        parallel = io.StringIO()
+        with redirect_stdout(parallel):
+            parallelMain(6, degreeClasses(6), 2, breakSymmetry)
+        assert parallel.getvalue() == serial.getvalue()
+
+def test_biClasses():
+    assert biClasses(5) == [(1, 2, 1), (3, 2, 1), (2, 3, 2), (4, 3, 2), (1, 4, 3), (3, 4, 3)]
+    assert biClasses(6) == [(2, 2, 1), (4, 2, 1), (2, 3, 2), (4, 3, 2), (2, 4, 3), (4, 4, 3), (2, 5, 4), (4, 5, 4)]
+    assert degreeClasses(5)[:2] == [[2, 1, 1, 1, 1], [2, 2, 2, 1, 1]]
+    assert all(sequences.isGraphical(degrees) for degrees in degreeClasses(7))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,144 @@
+from math import lgamma, exp, log
+import generator
+
+#Classes up to this size are costed by their exact labeled count
+EXACT_VERTICES = 12
+
+def isGraphical(degrees: list[int]) -> bool:
+    """
+    Erdős–Gallai: a sequence is the degree sequence of a simple graph
+    iff its sum is even and, sorted in decreasing order, for every k the
+    k largest degrees sum to at most k(k-1) + sum(min(d, k)) over the
+    rest.
+    """
+    degrees = sorted(degrees, reverse=True)
+    if sum(degrees) % 2 or (degrees and (degrees[-1] < 0 or degrees[0] >= len(degrees))):
+        return False
+    left = 0
+    for k in range(1, len(degrees) + 1):
+        left += degrees[k-1]
+        right = k*(k-1) + sum(min(d, k) for d in degrees[k:])
+        if left > right:
+            return False
+    return True
+
+def triSequences(vertices: int) -> list[list[int]]:
+    """
+    Graphical tridegreed sequences on consecutive degrees (deg1, deg1 - 1,
+    deg1 - 2), the three-degree analogue of main's bidegreed classes,
+    with every degree at least 1 and every degree present.
+    """
+    sequences = []
+    for deg1 in range(3, vertices):
+        for num1 in range(1, vertices - 1):
+            for num2 in range(1, vertices - num1):
+                degrees = [deg1]*num1 + [deg1-1]*num2 + [deg1-2]*(vertices-num1-num2)
+                if isGraphical(degrees):
+                    sequences.append(degrees)
+    return sequences
+
+def allSequences(vertices: int, minDegree: int = 1) -> list[list[int]]:
+    """
+    Every graphical non-increasing sequence on the given number of
+    vertices with all degrees at least minDegree (1 by default, since
+    graphs with isolated vertices are never connected).
+    """
+    sequences = []
+    def extend(prefix: list[int], most: int) -> None:
+        if len(prefix) == vertices:
+            if isGraphical(prefix):
+                sequences.append(list(prefix))
+            return
+        for degree in range(most, minDegree - 1, -1):
+            prefix.append(degree)
+            extend(prefix, degree)
+            prefix.pop()
+    extend([], vertices - 1)
+    return sequences
+
+def parseSequence(text: str) -> list[int]:
+    """
+    Reads a degree sequence written as "3,3,2,2" or "3^2,2^2".
+    """
+    degrees = []
+    for part in text.replace(" ", "").split(","):
+        if "^" in part:
+            degree, times = part.split("^")
+            degrees += [int(degree)]*int(times)
+        else:
+            degrees.append(int(part))
+    return degrees
+
+def estimateClassSize(degrees: list[int]) -> float:
+    """
+    Estimated number of labeled graphs with exactly this degree
+    sequence, from the configuration-model asymptotics of Bender-Canfield
+    and McKay-Wormald: (2m)! / (m! 2^m prod d!) * exp(-l - l^2) with
+    l = sum d(d-1) / 4m. Dense sequences are estimated through their
+    complement, which has the same count.
+    """
+    vertices = len(degrees)
+    if 2*sum(degrees) > vertices*(vertices-1):
+        degrees = [vertices - 1 - d for d in degrees]
+    total = sum(degrees)
+    if total == 0:
+        return 1.0
+    edges = total // 2
+    lam = sum(d*(d-1) for d in degrees) / (2*total)
+    logCount = lgamma(total + 1) - lgamma(edges + 1) - edges*log(2) - sum(lgamma(d + 1) for d in degrees)
+    return exp(logCount - lam - lam*lam)
+
+def estimateCost(degrees: list[int]) -> float:
+    """
+    Relative cost of searching a class: its labeled size, which bounds
+    the generation work and grows with every later stage. It is counted
+    exactly with generator.countValid on small classes and estimated on
+    larger ones.
+    """
+    if not isGraphical(degrees):
+        return 0.0
+    if len(degrees) <= EXACT_VERTICES:
+        return float(generator.countValid(len(degrees), degrees))
+    return estimateClassSize(degrees)
+
+def schedule(sequences: list[list[int]], shards: int = 1) -> list[list[list[int]]]:
+    """
+    Longest-processing-time packing: classes are taken in decreasing
+    order of estimated cost, and each goes to the shard with the least
+    estimated work so far. Each shard keeps its classes in decreasing
+    cost order, so the biggest classes start first and the small ones
+    fill the gaps at the end.
+    """
+    bins = [[] for _ in range(shards)]
+    loads = [0.0 for _ in range(shards)]
+    costs = [estimateCost(degrees) for degrees in sequences]
+    for i in sorted(range(len(sequences)), key=lambda i: -costs[i]):
+        target = loads.index(min(loads))
+        bins[target].append(sequences[i])
+        loads[target] += costs[i]
+    return bins
+
+#Unit tests
+def test_isGraphical():
+    assert isGraphical([3, 3, 2, 2, 2, 2])
+    assert isGraphical([])
+    assert not isGraphical([3, 3, 3, 2, 2, 2])
+    assert not isGraphical([3, 3, 1, 1])
+    assert not isGraphical([4, 1, 1, 1])
+    assert isGraphical([3, 1, 1, 1])
+
+def test_sequences():
+    assert [3, 2, 2, 1, 1, 1] in triSequences(6)
+    assert all(isGraphical(degrees) for degrees in triSequences(7))
+    assert allSequences(4) == [[3, 3, 3, 3], [3, 3, 2, 2], [3, 2, 2, 1], [3, 1, 1, 1], [2, 2, 2, 2], [2, 2, 1, 1], [1, 1, 1, 1]]
+    assert parseSequence("3^2, 2,2") == [3, 3, 2, 2]
+
+def test_schedule():
+    #labeled counts 10095 and 15740 are known exactly
+    assert 5000 < estimateClassSize([3]*6 + [2]*2) < 20000
+    assert 8000 < estimateClassSize([4]*6 + [3]*2) < 30000
+    assert estimateCost([3]*6 + [2]*2) == 10095.0 and estimateCost([3, 3, 1, 1]) == 0.0
+    sequences = triSequences(8)
+    bins = schedule(sequences, 3)
+    assert sorted(map(tuple, sum(bins, []))) == sorted(map(tuple, sequences))
+    assert all(estimateCost(b[i]) >= estimateCost(b[i+1]) for b in bins for i in range(len(b) - 1))